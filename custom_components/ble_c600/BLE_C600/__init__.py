@@ -1,8 +1,28 @@
 """Parser for C600 BLE advertisements."""
 from __future__ import annotations
 
-from .parser import C600BluetoothDeviceData, C600Device
+from typing import TYPE_CHECKING, Any
+
+from .decoder import decode_frame, decode_frames
+from .device import C600Device
+
+if TYPE_CHECKING:
+    from .parser import C600BluetoothDeviceData
 
 __version__ = "0.5.3"
 
-__all__ = ["C600BluetoothDeviceData", "C600Device"]
+__all__ = [
+    "C600BluetoothDeviceData",
+    "C600Device",
+    "decode_frame",
+    "decode_frames",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the connection stack (and bleak) only when it is used."""
+    if name == "C600BluetoothDeviceData":
+        from .parser import C600BluetoothDeviceData
+
+        return C600BluetoothDeviceData
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,232 @@
+"""Decode captured C600 frames offline
+
+Run with ``python -m BLE_C600`` from ``custom_components/ble_c600``.
+Reads raw frames from stdin or files, either as hex lines or as binary
+fixed size records, and writes one JSON Lines or CSV row per frame.
+
+Hex lines hold the frame, contiguous or as space or comma separated
+groups, optionally preceded by a timestamp that is copied to the output;
+blank lines and lines starting with ``#`` are skipped. Input is processed
+in chunks, so memory use does not grow with the size of the capture.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from collections.abc import Iterable, Iterator
+import csv
+import io
+import json
+import sys
+from typing import BinaryIO
+
+from .decoder import decode_frames
+from .frame import (
+    FRAME_FIELDS,
+    FRAME_LENGTH,
+    InvalidFrameError,
+    sensors_from_values,
+    unpack_frame,
+)
+
+# Frames handed to a worker at once
+CHUNK_SIZE = 4096
+
+COLUMNS = (
+    "source",
+    "index",
+    "time",
+    "raw",
+    *(field.key for field in FRAME_FIELDS),
+    "salt",
+    "error",
+)
+
+# source name, index in the source, timestamp, raw frame or parse error
+Record = tuple[str, int, str | None, bytes | str]
+
+
+def _is_hex(field: str) -> bool:
+    try:
+        bytes.fromhex(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _split_hex_line(text: str) -> tuple[str | None, str]:
+    """Split a hex line into its timestamp, if any, and the frame."""
+    fields = text.replace(",", " ").split()
+    # The frame is the run of hex fields at the end of the line.
+    start = len(fields)
+    while start and _is_hex(fields[start - 1]):
+        start -= 1
+    if start == len(fields):
+        # Report the last field as the frame that is not hex.
+        start -= 1
+    elif (
+        start + 1 < len(fields)
+        and fields[start].isdigit()
+        and len(fields[start]) != len(fields[start + 1])
+    ):
+        # A unix timestamp is valid hex too, but it is not as long as the
+        # groups of the frame after it.
+        start += 1
+    return " ".join(fields[:start]) or None, "".join(fields[start:])
+
+
+def read_hex(name: str, stream: BinaryIO) -> Iterator[Record]:
+    """Yield the frames of a stream of hex lines."""
+    for index, line in enumerate(stream):
+        text = line.decode("ascii", "replace").strip()
+        if not text or text.startswith("#"):
+            continue
+        timestamp, frame = _split_hex_line(text)
+        try:
+            raw: bytes | str = bytes.fromhex(frame)
+        except ValueError:
+            raw = f"Not a hex frame: {frame[:32]}"
+        yield name, index, timestamp, raw
+
+
+def read_binary(name: str, stream: BinaryIO, record_size: int) -> Iterator[Record]:
+    """Yield the frames of a stream of fixed size binary records."""
+    index = 0
+    while record := stream.read(record_size):
+        if len(record) < record_size:
+            yield name, index, None, f"Truncated record: {len(record)} bytes"
+            return
+        yield name, index, None, record
+        index += 1
+
+
+def _row(record: Record, decoded: bytes | None, validate: bool) -> dict[str, object]:
+    """Return the output row of a frame."""
+    name, index, timestamp, raw = record
+    row: dict[str, object] = {"source": name, "index": index, "time": timestamp}
+    if isinstance(raw, str):
+        row["error"] = raw
+        return row
+    row["raw"] = raw.hex()
+    try:
+        values = unpack_frame(decoded, validate=validate)
+    except InvalidFrameError as err:
+        row["error"] = str(err)
+        return row
+    row.update(values)
+    row["salt"] = sensors_from_values(values)["salt"]
+    return row
+
+
+def decode_chunk(chunk: list[Record], output: str, validate: bool) -> str:
+    """Decode a chunk of records and return them formatted.
+
+    Runs in the worker processes, so it only takes and returns picklable
+    values.
+    """
+    frames = [record[3] for record in chunk if not isinstance(record[3], str)]
+    decoded = iter(decode_frames(frames))
+    rows = (
+        _row(record, None if isinstance(record[3], str) else next(decoded), validate)
+        for record in chunk
+    )
+    if output == "csv":
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, COLUMNS, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    chunk: list[Record] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(
+    records: Iterable[Record],
+    out: io.TextIOBase,
+    output: str = "jsonl",
+    validate: bool = False,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """Decode ``records`` and write them to ``out`` in input order."""
+    if output == "csv":
+        csv.writer(out, lineterminator="\n").writerow(COLUMNS)
+    chunks = _chunks(records, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            out.write(decode_chunk(chunk, output, validate))
+        return
+
+    from multiprocessing import Pool
+
+    # Pool.imap would read the whole input ahead, keep a bounded number of
+    # chunks in flight instead.
+    with Pool(workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(decode_chunk, (chunk, output, validate)))
+            if len(pending) >= 2 * workers:
+                out.write(pending.popleft().get())
+        while pending:
+            out.write(pending.popleft().get())
+
+
+def _records(args: argparse.Namespace) -> Iterator[Record]:
+    sources = args.files or ["-"]
+    for name in sources:
+        stream = sys.stdin.buffer if name == "-" else open(name, "rb")
+        try:
+            if args.input == "hex":
+                yield from read_hex(name, stream)
+            else:
+                yield from read_binary(name, stream, args.record_size)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+
+def main() -> None:
+    """Decode the frames given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="captures to decode, - for stdin")
+    parser.add_argument("--input", choices=("hex", "binary"), default="hex")
+    parser.add_argument(
+        "--record-size",
+        type=int,
+        default=FRAME_LENGTH + 1,
+        help="size of a binary record in bytes",
+    )
+    parser.add_argument("--output", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument(
+        "--validate", action="store_true", help="report implausible frames as errors"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.record_size < 1:
+        parser.error("--record-size must be positive")
+
+    try:
+        run(
+            _records(args),
+            sys.stdout,
+            args.output,
+            args.validate,
+            args.workers,
+            args.chunk_size,
+        )
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Fixed size ring buffer of raw C600 frames
+
+Records are written in place into a preallocated buffer, optionally a
+memory mapped file, so capturing a frame allocates nothing and the last
+frames survive a restart.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"C600RING"
+VERSION = 1
+MAX_FRAME_SIZE = 64
+
+# magic, version, capacity, record size, next slot, records written
+_HEADER = struct.Struct("<8sHIIIQ")
+# timestamp, frame length, frame
+_RECORD = struct.Struct(f"<dH{MAX_FRAME_SIZE}s")
+_HEADER_SIZE = 64
+
+
+class FrameRing:
+    """Keep the last ``capacity`` raw frames with their timestamps."""
+
+    def __init__(self, capacity: int, buffer: bytearray | mmap.mmap | None = None) -> None:
+        """Initialize the ring on ``buffer`` or in memory."""
+        self.capacity = capacity
+        size = _HEADER_SIZE + capacity * _RECORD.size
+        self._file: int | None = None
+        self._buffer = bytearray(size) if buffer is None else buffer
+        magic, version, stored_capacity, record_size, slot, written = _HEADER.unpack_from(
+            self._buffer
+        )
+        if (magic, version, stored_capacity, record_size) != (
+            MAGIC,
+            VERSION,
+            capacity,
+            _RECORD.size,
+        ):
+            slot = written = 0
+            self._buffer[:size] = bytes(size)
+        self._slot = slot
+        self._written = written
+        self._write_header()
+
+    @classmethod
+    def open(cls, path: str, capacity: int) -> FrameRing:
+        """Open or create a ring backed by a memory mapped file.
+
+        This does blocking I/O, run it in an executor.
+        """
+        size = _HEADER_SIZE + capacity * _RECORD.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            buffer = mmap.mmap(fd, size)
+        except OSError:
+            os.close(fd)
+            raise
+        ring = cls(capacity, buffer)
+        ring._file = fd
+        return ring
+
+    def close(self) -> None:
+        """Flush and close the backing file. This does blocking I/O."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+            self._buffer.close()
+        if self._file is not None:
+            os.close(self._file)
+            self._file = None
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    @property
+    def written(self) -> int:
+        """Return the number of frames captured since the ring was created."""
+        return self._written
+
+    def append(self, frame: bytes | bytearray | memoryview, timestamp: float | None = None) -> None:
+        """Capture a frame, overwriting the oldest one when full."""
+        _RECORD.pack_into(
+            self._buffer,
+            _HEADER_SIZE + self._slot * _RECORD.size,
+            time.time() if timestamp is None else timestamp,
+            min(len(frame), MAX_FRAME_SIZE),
+            frame,
+        )
+        self._slot = (self._slot + 1) % self.capacity
+        self._written += 1
+        self._write_header()
+
+    def frames(self) -> list[tuple[float, bytes]]:
+        """Return the captured frames, oldest first."""
+        count = len(self)
+        first = (self._slot - count) % self.capacity
+        frames = []
+        for index in range(count):
+            slot = (first + index) % self.capacity
+            timestamp, length, frame = _RECORD.unpack_from(
+                self._buffer, _HEADER_SIZE + slot * _RECORD.size
+            )
+            frames.append((timestamp, frame[:length]))
+        return frames
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(
+            self._buffer,
+            0,
+            MAGIC,
+            VERSION,
+            self.capacity,
+            _RECORD.size,
+            self._slot,
+            self._written,
+        )
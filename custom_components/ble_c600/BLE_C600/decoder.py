@@ -0,0 +1,132 @@
+"""Table driven decoder for scrambled C600 frames"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+# The device swaps every bit pair and inverts the result while walking the
+# frame backwards.  Unrolled, every decoded byte takes its odd bits from one
+# neighbour and its even bits from another, so each output byte is the OR of
+# two single byte lookups into the tables below.
+_HI_TABLE = bytes((((~value) & 0x55) << 1) for value in range(256))
+_LO_TABLE = bytes((((~value) & 0xAA) >> 1) for value in range(256))
+
+
+def decode_frame(frame: bytes | bytearray | memoryview) -> bytes:
+    """Decode a single raw frame as read from the device."""
+    if not isinstance(frame, bytes):
+        frame = bytes(frame)
+    size = len(frame)
+    if size < 2:
+        return frame
+
+    high = frame.translate(_HI_TABLE)
+    low = frame.translate(_LO_TABLE)
+    if size == 2:
+        return bytes((high[0] | low[1], high[1] | low[0]))
+
+    decoded = bytearray(size)
+    decoded[1:-1] = (
+        int.from_bytes(high[2:], "big") | int.from_bytes(low[:-2], "big")
+    ).to_bytes(size - 2, "big")
+    _fix_edges(decoded, 0, size, frame, high, low)
+    return bytes(decoded)
+
+
+def decode_frames(
+    frames: Iterable[bytes | bytearray | memoryview],
+) -> list[bytes]:
+    """Decode many raw frames.
+
+    Frames of equal length are decoded with a single pass over their
+    concatenation, only the three edge bytes of every frame are patched
+    afterwards.
+    """
+    frames = [bytes(frame) for frame in frames]
+    if not frames:
+        return []
+
+    size = len(frames[0])
+    if size < 3 or any(len(frame) != size for frame in frames):
+        return [decode_frame(frame) for frame in frames]
+
+    joined = b"".join(frames)
+    high = joined.translate(_HI_TABLE)
+    low = joined.translate(_LO_TABLE)
+    decoded = bytearray(len(joined))
+    decoded[1:-1] = (
+        int.from_bytes(high[2:], "big") | int.from_bytes(low[:-2], "big")
+    ).to_bytes(len(joined) - 2, "big")
+    for start in range(0, len(joined), size):
+        _fix_edges(decoded, start, size, joined, high, low)
+
+    return [bytes(decoded[start : start + size]) for start in range(0, len(joined), size)]
+
+
+def decode_array(frames: Sequence[Sequence[int]]):
+    """Decode a 2-D uint8 NumPy array holding one raw frame per row."""
+    # numpy is optional and slow to import, only load it when needed.
+    try:
+        import numpy as np
+    except ImportError as err:
+        raise RuntimeError("numpy is required for decode_array") from err
+
+    raw = np.asarray(frames, dtype=np.uint8)
+    if raw.ndim != 2:
+        raise ValueError("Expected a 2-D array of frames")
+    if raw.shape[1] < 3:
+        return np.array(
+            [list(decode_frame(row.tobytes())) for row in raw], dtype=np.uint8
+        ).reshape(raw.shape)
+
+    high = np.frombuffer(_HI_TABLE, dtype=np.uint8)[raw]
+    low = np.frombuffer(_LO_TABLE, dtype=np.uint8)[raw]
+    decoded = np.empty_like(raw)
+    decoded[:, 1:-1] = high[:, 2:] | low[:, :-2]
+    decoded[:, 0] = high[:, 0] | (raw[:, 1] & 0x55)
+    decoded[:, -2] = (raw[:, -1] & 0xAA) | low[:, -3]
+    decoded[:, -1] = high[:, -1] | low[:, -2]
+    return decoded
+
+
+def encode_frame(decoded: bytes | bytearray | memoryview) -> bytes:
+    """Scramble a decoded frame back into the form the device sends."""
+    size = len(decoded)
+    if size < 2:
+        return bytes(decoded)
+    if size == 2:
+        return bytes(
+            (
+                (((~decoded[0]) & 0xAA) >> 1) | (((~decoded[1]) & 0x55) << 1),
+                (((~decoded[1]) & 0xAA) >> 1) | (((~decoded[0]) & 0x55) << 1),
+            )
+        )
+
+    frame = bytearray(size)
+    # Even bits of the frame end up (inverted) in the odd bits of the byte
+    # before, odd bits (inverted) in the even bits of the byte after.
+    for idx in range(1, size - 2):
+        frame[idx + 1] |= ((~decoded[idx]) & 0xAA) >> 1
+        frame[idx - 1] |= ((~decoded[idx]) & 0x55) << 1
+    frame[0] |= ((~decoded[0]) & 0xAA) >> 1
+    frame[1] |= decoded[0] & 0x55
+    frame[size - 1] |= decoded[size - 2] & 0xAA
+    frame[size - 3] |= ((~decoded[size - 2]) & 0x55) << 1
+    frame[size - 1] |= ((~decoded[size - 1]) & 0xAA) >> 1
+    frame[size - 2] |= ((~decoded[size - 1]) & 0x55) << 1
+    return bytes(frame)
+
+
+def _fix_edges(
+    decoded: bytearray,
+    start: int,
+    size: int,
+    frame: bytes,
+    high: bytes,
+    low: bytes,
+) -> None:
+    """Patch the bytes that do not follow the interior rule."""
+    last = start + size - 1
+    decoded[start] = high[start] | (frame[start + 1] & 0x55)
+    decoded[last - 1] = (frame[last] & 0xAA) | low[last - 2]
+    decoded[last] = high[last] | low[last - 1]
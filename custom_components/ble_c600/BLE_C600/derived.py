@@ -0,0 +1,144 @@
+"""Incremental statistics and derived values of C600 readings"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, MutableMapping
+from math import exp
+
+# Suffixes of the statistics added for every tracked sensor
+STATISTICS = ("ema", "min", "max", "mean", "rate")
+
+
+def free_chlorine(ph: float, orp: float, adjust: float = 0) -> float | None:
+    """Estimate free chlorine in ppm from pH and ORP (in volt).
+
+    Empirical fit used by pool controllers, only defined for pH between
+    4.1 and 14.
+    """
+    orp_mv = orp * 1000
+    if not 4.1 < ph < 14 or orp_mv == 400:
+        return None
+    try:
+        return round(
+            0.23
+            * (1 - adjust)
+            * (14 - ph) ** (1 / (400 - orp_mv))
+            * (ph - 4.1) ** ((orp_mv - 516) / 145)
+            + 10.0 ** ((orp_mv + ph * 70 - 1282) / 40),
+            1,
+        )
+    except (OverflowError, ZeroDivisionError):
+        return None
+
+
+class RollingWindow:
+    """Min, max and mean over the samples of the last ``window`` seconds.
+
+    Min and max use monotonic queues and the mean a running sum, so every
+    update costs amortized O(1).
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._samples: deque[tuple[float, float]] = deque()
+        self._minimum: deque[tuple[float, float]] = deque()
+        self._maximum: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def add(self, now: float, value: float) -> None:
+        """Add a sample and drop the ones that left the window."""
+        self._samples.append((now, value))
+        self._sum += value
+        while self._minimum and self._minimum[-1][1] >= value:
+            self._minimum.pop()
+        self._minimum.append((now, value))
+        while self._maximum and self._maximum[-1][1] <= value:
+            self._maximum.pop()
+        self._maximum.append((now, value))
+
+        oldest = now - self.window
+        while self._samples[0][0] < oldest:
+            self._sum -= self._samples.popleft()[1]
+        while self._minimum[0][0] < oldest:
+            self._minimum.popleft()
+        while self._maximum[0][0] < oldest:
+            self._maximum.popleft()
+
+    @property
+    def minimum(self) -> float:
+        return self._minimum[0][1]
+
+    @property
+    def maximum(self) -> float:
+        return self._maximum[0][1]
+
+    @property
+    def mean(self) -> float:
+        return self._sum / len(self._samples)
+
+
+class SensorStatistics:
+    """Exponential moving average, rolling window and rate of one sensor."""
+
+    def __init__(self, window: float, time_constant: float) -> None:
+        self.time_constant = time_constant
+        self.rolling = RollingWindow(window)
+        self.ema: float | None = None
+        self.rate: float | None = None
+        self._last: tuple[float, float] | None = None
+
+    def add(self, now: float, value: float) -> None:
+        """Add a sample taken at ``now`` (seconds)."""
+        if self._last is None:
+            self.ema = value
+        else:
+            last_time, last_value = self._last
+            elapsed = now - last_time
+            if elapsed <= 0:
+                return
+            # Irregular intervals: weight by the time since the last sample.
+            alpha = 1 - exp(-elapsed / self.time_constant)
+            self.ema += alpha * (value - self.ema)
+            self.rate = (value - last_value) * 3600 / elapsed
+        self._last = (now, value)
+        self.rolling.add(now, value)
+
+
+class DerivedMetrics:
+    """Add statistics and estimates to the sensors of each new reading.
+
+    For every tracked sensor ``<key>_ema``, ``<key>_min``, ``<key>_max``,
+    ``<key>_mean`` and ``<key>_rate`` (change per hour) are added, together
+    with the ``freeChlorine`` estimate.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        window: float,
+        time_constant: float,
+    ) -> None:
+        self._statistics = {
+            key: SensorStatistics(window, time_constant) for key in keys
+        }
+
+    def update(self, sensors: MutableMapping[str, object], now: float) -> None:
+        """Feed a reading and add the derived values to ``sensors``."""
+        for key, statistics in self._statistics.items():
+            value = sensors.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            statistics.add(now, value)
+            sensors[f"{key}_ema"] = round(statistics.ema, 3)
+            sensors[f"{key}_min"] = statistics.rolling.minimum
+            sensors[f"{key}_max"] = statistics.rolling.maximum
+            sensors[f"{key}_mean"] = round(statistics.rolling.mean, 3)
+            sensors[f"{key}_rate"] = (
+                None if statistics.rate is None else round(statistics.rate, 3)
+            )
+
+        ph = sensors.get("pH")
+        orp = sensors.get("ORP")
+        if isinstance(ph, (int, float)) and isinstance(orp, (int, float)):
+            sensors["freeChlorine"] = free_chlorine(ph, orp)
@@ -0,0 +1,19 @@
+"""Readings of a C600 device"""
+
+from __future__ import annotations
+
+import dataclasses
+
+
+@dataclasses.dataclass
+class C600Device:
+    """Response data with information about the C600 device"""
+
+    hw_version: str = ""
+    sw_version: str = ""
+    name: str = ""
+    identifier: str = ""
+    address: str = ""
+    sensors: dict[str, str | float | None] = dataclasses.field(
+        default_factory=lambda: {}
+    )
@@ -0,0 +1,102 @@
+"""Append only CSV files of C600 readings with rotation and compression
+
+Everything here does blocking I/O and is meant to run in an executor.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+import csv
+from datetime import datetime, timezone
+import glob
+import gzip
+import os
+import shutil
+
+# Size after which the file is rotated, in bytes
+MAX_BYTES = 8 * 1024 * 1024
+# Compressed files kept after rotation
+BACKUPS = 30
+
+# A reading: its unix timestamp and sensors
+Row = tuple[float, Mapping[str, object]]
+
+
+class RotatingCsvWriter:
+    """Append readings to a CSV file, one column per sensor.
+
+    Once the file grows past ``max_bytes``, or a reading has sensors the
+    header does not cover, it is renamed with a timestamp and gzip
+    compressed. Only the newest ``backups`` compressed files are kept.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int = MAX_BYTES, backups: int = BACKUPS
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._columns: list[str] | None = None
+
+    def _read_header(self) -> list[str] | None:
+        try:
+            with open(self.path, newline="", encoding="utf-8") as file:
+                return next(csv.reader(file), None)
+        except FileNotFoundError:
+            return None
+
+    def write(self, rows: Sequence[Row]) -> None:
+        """Append the readings, rotating the file when needed."""
+        if not rows:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self._columns is None:
+            self._columns = self._read_header()
+
+        file = None
+        writer = None
+        try:
+            for timestamp, sensors in rows:
+                if self._columns is None or not sensors.keys() <= set(self._columns):
+                    if file is not None:
+                        file.close()
+                        file = None
+                    if self._columns is not None:
+                        self.rotate()
+                    self._columns = ["time", *sensors]
+                if file is None:
+                    new = not os.path.exists(self.path) or not os.path.getsize(self.path)
+                    file = open(self.path, "a", newline="", encoding="utf-8")
+                    writer = csv.writer(file)
+                    if new:
+                        writer.writerow(self._columns)
+                writer.writerow(
+                    [
+                        datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                        *(sensors.get(column) for column in self._columns[1:]),
+                    ]
+                )
+        finally:
+            if file is not None:
+                file.close()
+
+        if os.path.getsize(self.path) >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self) -> None:
+        """Compress the current file and start a new one."""
+        if not os.path.exists(self.path):
+            return
+        stem, extension = os.path.splitext(self.path)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = f"{stem}.{stamp}{extension}"
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+        self._columns = None
+
+        # The timestamp sorts the compressed files from oldest to newest.
+        rotated_files = sorted(glob.glob(f"{glob.escape(stem)}.*{extension}.gz"))
+        for old in rotated_files[: -self.backups or None]:
+            os.remove(old)
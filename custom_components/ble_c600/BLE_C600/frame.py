@@ -0,0 +1,168 @@
+"""Field layout of a decoded C600 frame"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import struct
+from typing import NamedTuple
+
+from .const import BATT_0, BATT_100
+from .decoder import encode_frame
+
+
+class FrameField(NamedTuple):
+    """A single value stored in a decoded frame.
+
+    The raw value is read big endian at ``offset``. ``span`` maps the raw
+    value linearly onto 0-100 (used for the battery voltage), ``scale``
+    divides it and ``clamp`` bounds the result. Frames whose value is outside
+    ``valid`` before clamping are rejected as corrupt. Fields without
+    ``sensor`` are protocol metadata and are not published, ``constant``
+    ones never change for a given device.
+    """
+
+    key: str
+    offset: int
+    width: int = 2
+    signed: bool = True
+    scale: float | None = None
+    span: tuple[int, int] | None = None
+    clamp: tuple[float | None, float | None] | None = None
+    valid: tuple[float, float] | None = None
+    sensor: bool = True
+    constant: bool = False
+
+
+FRAME_FIELDS: tuple[FrameField, ...] = (
+    FrameField("constant", 1, width=1, signed=False, sensor=False, constant=True),
+    FrameField("product_code", 2, width=1, signed=False, sensor=False, constant=True),
+    FrameField("pH", 3, scale=100.0, valid=(0, 14)),
+    FrameField("EC", 5, valid=(0, 30000)),
+    FrameField("TDS", 7, valid=(0, 30000)),
+    FrameField("cloro", 11, scale=10.0, clamp=(0, None), valid=(-100, 100)),
+    FrameField("temperature", 13, scale=10.0, valid=(-20, 80)),
+    FrameField(
+        "battery", 15, span=(BATT_0, BATT_100), clamp=(0, 100), valid=(-50, 150)
+    ),
+    FrameField("status", 17, width=1, signed=False, sensor=False),
+    FrameField("ORP", 20, scale=1000.0, valid=(-2, 2)),
+)
+
+# Salt is estimated from the conductivity reading.
+SALT_FACTOR = 0.55
+
+_FORMATS = {(1, False): "B", (1, True): "b", (2, False): "H", (2, True): "h"}
+
+
+def _build_struct(fields: tuple[FrameField, ...]) -> struct.Struct:
+    """Build a big endian struct covering every field, padding the gaps."""
+    fmt = ">"
+    position = 0
+    for field in sorted(fields, key=lambda field: field.offset):
+        if field.offset < position:
+            raise ValueError(f"Field {field.key} overlaps the previous field")
+        if field.offset > position:
+            fmt += f"{field.offset - position}x"
+        fmt += _FORMATS[(field.width, field.signed)]
+        position = field.offset + field.width
+    return struct.Struct(fmt)
+
+
+_SORTED_FIELDS = tuple(sorted(FRAME_FIELDS, key=lambda field: field.offset))
+FRAME_STRUCT = _build_struct(FRAME_FIELDS)
+FRAME_LENGTH = FRAME_STRUCT.size
+CONSTANT_FIELDS = tuple(field.key for field in FRAME_FIELDS if field.constant)
+
+
+class InvalidFrameError(Exception):
+    """Raised when a frame is truncated or carries implausible values."""
+
+
+def _convert(field: FrameField, raw: int, validate: bool = False) -> float | int:
+    """Turn a raw field value into its published value."""
+    value: float | int = raw
+    if field.span is not None:
+        low, high = field.span
+        value = round(100 * (raw - low) / (high - low))
+    if field.scale is not None:
+        value = value / field.scale
+    if validate and field.valid is not None:
+        low, high = field.valid
+        if not low <= value <= high:
+            raise InvalidFrameError(f"{field.key} out of range: {value}")
+    if field.clamp is not None:
+        low, high = field.clamp
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(value, high)
+    return value
+
+
+def unpack_frame(
+    decoded: bytes | bytearray | memoryview,
+    validate: bool = False,
+    constants: Mapping[str, int] | None = None,
+) -> dict[str, float | int]:
+    """Unpack every field of a decoded frame, converted to its published value.
+
+    With ``validate`` an InvalidFrameError is raised for truncated frames,
+    values outside their valid range and constant fields that differ from
+    ``constants``.
+    """
+    if validate and len(decoded) < FRAME_LENGTH:
+        raise InvalidFrameError(f"Frame too short: {len(decoded)} bytes")
+    try:
+        raw_values = FRAME_STRUCT.unpack_from(decoded)
+    except struct.error as err:
+        raise InvalidFrameError(str(err)) from err
+    values = {
+        field.key: _convert(field, raw, validate) if field.sensor else raw
+        for field, raw in zip(_SORTED_FIELDS, raw_values)
+    }
+    if validate and constants:
+        for key, expected in constants.items():
+            if values[key] != expected:
+                raise InvalidFrameError(f"Unexpected {key}: {values[key]} != {expected}")
+    return values
+
+
+def sensors_from_values(values: Mapping[str, float | int]) -> dict[str, float | int]:
+    """Return the published sensors out of unpacked frame values."""
+    sensors = {field.key: values[field.key] for field in FRAME_FIELDS if field.sensor}
+    sensors["salt"] = sensors["EC"] * SALT_FACTOR
+    return sensors
+
+
+def parse_sensors(decoded: bytes | bytearray | memoryview) -> dict[str, float | int]:
+    """Return the published sensor values of a decoded frame."""
+    return sensors_from_values(unpack_frame(decoded))
+
+
+def _to_raw(field: FrameField, value: float | int) -> int:
+    """Invert the conversion of a field (clamping is not reversible)."""
+    if not field.sensor:
+        return int(value)
+    if field.scale is not None:
+        value = value * field.scale
+    if field.span is not None:
+        low, high = field.span
+        value = low + value * (high - low) / 100
+    return round(value)
+
+
+def build_frame(values: dict[str, float | int], length: int = FRAME_LENGTH + 1) -> bytes:
+    """Build a scrambled frame as the device would send it.
+
+    Missing fields are left at zero, so a frame built from the output of
+    ``unpack_frame`` round trips. Meant for tests and simulations.
+    """
+    if length < FRAME_LENGTH:
+        raise ValueError(f"Frames need at least {FRAME_LENGTH} bytes")
+    decoded = bytearray(length)
+    FRAME_STRUCT.pack_into(
+        decoded,
+        0,
+        *(_to_raw(field, values.get(field.key, 0)) for field in _SORTED_FIELDS),
+    )
+    return encode_frame(decoded)
@@ -0,0 +1,100 @@
+"""Check the import time of the pure parts of BLE_C600
+
+Run with ``python -m BLE_C600.import_budget`` from ``custom_components/ble_c600``.
+Imports each module in a fresh interpreter with ``-X importtime`` and fails
+when it takes longer than its budget or pulls in the connection stack.
+Exits with status 1 on any violation, so it can gate CI; the ``Import time``
+workflow runs it on every push.
+
+The integration modules (coordinator, sensor, config flow, ...) are not
+covered: they import Home Assistant, whose bluetooth component loads bleak
+before the integration does, so their import time is Home Assistant's and
+the connection stack is already there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGETS = {
+    "BLE_C600": 40.0,
+    "BLE_C600.decoder": 40.0,
+    "BLE_C600.frame": 40.0,
+    "BLE_C600.derived": 40.0,
+    "BLE_C600.__main__": 40.0,
+}
+
+# Modules the budgeted ones must not import
+FORBIDDEN = ("bleak", "bleak_retry_connector", "numpy")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Import ``module`` in a new interpreter.
+
+    Return its cumulative import time in milliseconds and the names of all
+    modules imported on the way.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    cumulative = 0.0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        name = name.strip()
+        if total.strip().isdigit():
+            imported.add(name)
+            if name == module:
+                cumulative = int(total) / 1000
+    return cumulative, imported
+
+
+def check(repeat: int = 5, scale: float = 1.0) -> list[str]:
+    """Return the violations, using the fastest of ``repeat`` imports."""
+    violations = []
+    for module, budget in BUDGETS.items():
+        try:
+            runs = [measure(module) for _ in range(repeat)]
+        except ImportError as err:
+            violations.append(f"{module} does not import: {err}")
+            continue
+        elapsed = min(elapsed for elapsed, _ in runs)
+        imported = runs[0][1]
+        print(f"{module:>20}: {elapsed:8.3f} ms (budget {budget * scale:.0f} ms)")
+        if elapsed > budget * scale:
+            violations.append(f"{module} took {elapsed:.3f} ms")
+        for forbidden in FORBIDDEN:
+            if forbidden in imported:
+                violations.append(f"{module} imports {forbidden}")
+    return violations
+
+
+def main() -> None:
+    """Print the import times and exit with 1 when over budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the budgets, for slow hosts"
+    )
+    args = parser.parse_args()
+
+    violations = check(args.repeat, args.scale)
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
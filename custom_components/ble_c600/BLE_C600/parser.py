@@ -3,42 +3,47 @@
 from __future__ import annotations
 
 import asyncio
-import dataclasses
-import struct
-from collections import namedtuple
-from datetime import datetime
+from contextlib import AbstractAsyncContextManager, nullcontext
 import logging
+from logging import Logger
+import random
+from typing import TYPE_CHECKING, Any, Callable
 
-# from logging import Logger
-from math import exp
-from typing import Any, Callable, Tuple
+from bleak import BleakError
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
 
-from bleak import BleakClient, BleakError
-from bleak.backends.device import BLEDevice
-from bleak_retry_connector import establish_connection
-
-from .const import (
-    BATT_100, BATT_0
+from .capture import FrameRing
+from .decoder import decode_frame
+from .device import C600Device
+from .frame import (
+    CONSTANT_FIELDS,
+    FRAME_LENGTH,
+    InvalidFrameError,
+    sensors_from_values,
+    unpack_frame,
 )
+from .timing import UpdateTimings
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
+    from bleak.backends.characteristic import BleakGATTCharacteristic
+    from bleak.backends.device import BLEDevice
+    from bleak.backends.service import BleakGATTServiceCollection
 
 
 READ_UUID = "0000ff02-0000-1000-8000-00805f9b34fb"
 
-_LOGGER = logging.getLogger(__name__)
+# Reads of a corrupt frame over the same connection before giving up
+READ_ATTEMPTS = 3
 
+# Connection attempts made by establish_connection
+MAX_ATTEMPTS = 4
 
-@dataclasses.dataclass
-class C600Device:
-    """Response data with information about the C600 device"""
+RECONNECT_DELAY = 5
+MAX_RECONNECT_DELAY = 300
+
+_LOGGER = logging.getLogger(__name__)
 
-    hw_version: str = ""
-    sw_version: str = ""
-    name: str = ""
-    identifier: str = ""
-    address: str = ""
-    sensors: dict[str, str | float | None] = dataclasses.field(
-        default_factory=lambda: {}
-    )
 
 # pylint: disable=too-many-locals
 # pylint: disable=too-many-branches
@@ -55,33 +60,60 @@ class C600BluetoothDeviceData:
         super().__init__()
         self.logger = logger
         self.logger.debug("In Device Data")
+        self._listen_task: asyncio.Task | None = None
+        # Kept across connections so reconnects skip service discovery and
+        # steady state polling updates a single C600Device in place.
+        self._device = C600Device()
+        self._services: BleakGATTServiceCollection | None = None
+        self._read_char: BleakGATTCharacteristic | None = None
+        # Raw frames are kept here when set, see capture.FrameRing.
+        self.capture: FrameRing | None = None
+        self.timings = UpdateTimings()
+        # Constant frame fields, learned from the first valid frame.
+        self._constants: dict[str, int] | None = None
+        # Read on every connection, so changes apply to the next one.
+        self.connect_timeout: float | None = None
+        self.max_attempts = MAX_ATTEMPTS
         
     def decode(self, byte_frame : bytes ):
-
-        frame_array = [int(x) for x in byte_frame]
-        size = len(frame_array)
-
-        for i in range(size-1, 0 , -1):
-            tmp=frame_array[i]
-            hibit1=(tmp&0x55)<<1
-            lobit1=(tmp&0xAA)>>1
-            tmp=frame_array[i-1]
-            hibit=(tmp&0x55)<<1
-            lobit=(tmp&0xAA)>>1
-            frame_array[i]=0xff -(hibit1|lobit)
-            frame_array[i-1]= 0xff -(hibit|lobit1)
-
-        return frame_array
+        """Unscramble a raw frame read from the device."""
+        return decode_frame(byte_frame)
     
     def decode_position(self,decodedData,idx):
         return int.from_bytes(decodedData[idx:idx+2], byteorder="big", signed=True)
         
     async def _get_status(self, client: BleakClient, device: C600Device) -> C600Device:
         _LOGGER.debug("Getting Status")
-        data = await client.read_gatt_char(READ_UUID)
-        #_LOGGER.debug("Raw BLE bytes: %s", [hex(b) for b in data])  # Optional but helpful
+        for attempt in range(1, READ_ATTEMPTS + 1):
+            with self.timings.measure("read"):
+                data = await client.read_gatt_char(self._read_char or READ_UUID)
+            #_LOGGER.debug("Raw BLE bytes: %s", [hex(b) for b in data])  # Optional but helpful
+
+            try:
+                device = self._parse_frame(data, device)
+            except InvalidFrameError as err:
+                if attempt == READ_ATTEMPTS:
+                    # Maybe the learned constants were wrong, learn them again.
+                    self._constants = None
+                    raise
+                _LOGGER.debug("Invalid frame, reading again: %s", err)
+                self.timings.retries += 1
+            else:
+                break
+        _LOGGER.debug("Got Status")
+        return device
+
+    def _parse_frame(self, data: bytes | bytearray, device: C600Device) -> C600Device:
+        if self.capture is not None:
+            self.capture.append(data)
+        with self.timings.measure("decode"):
+            return self._decode_into(data, device)
 
+    def _decode_into(self, data: bytes | bytearray, device: C600Device) -> C600Device:
         decodedData = self.decode(data)
+        values = unpack_frame(decodedData, validate=True, constants=self._constants)
+        if self._constants is None:
+            self._constants = {key: int(values[key]) for key in CONSTANT_FIELDS}
         #_LOGGER.debug("Decoded BLE data: %s", decodedData)
 
         #for i in range(0, len(decodedData) - 1):  # Prevent out-of-bounds
@@ -91,73 +123,219 @@ class C600BluetoothDeviceData:
         #    except Exception as e:
         #        _LOGGER.debug("Pos %02d-%02d: decode failed (%s)", i, i + 1, e)
         
-        # temp = ((message[13]<<8) + message[14]);
-        # ph = ((message[3]<<8) + message[4]);
-        # orp = ((message[9]<<8) + message[10]);
-        # battery = ((message[15]<<8) + message[16]);
-        # ec = ((message[5]<<8) + message[6]);
-        # tds = ((message[7]<<8) + message[8]);
-        # cloro = ((message[11]<<8) + message[12]);
-        # id(ble_c600_temperature_sensor).publish_state(temp/10.0);
-        # id(ble_c600_ph_sensor).publish_state(ph/100.0);
-        # id(ble_c600_orp_sensor).publish_state(orp);
-        # id(ble_c600_battery).publish_state(battery/31.9);
-        # id(ble_c600_ec_sensor).publish_state(ec);
-        # id(ble_c600_tds_sensor).publish_state(tds);
-        # id(ble_c600_cloro).publish_state(cloro/10.0)
-        
-        constant = decodedData[1]
-        product_name_code = decodedData[2]
-        hold_reading = decodedData[17] >> 4
-
-        backlight_status = (decodedData[17] & 0x0F) >> 3
+        device.sensors.update(sensors_from_values(values))
 
-        battery = round(100 * (self.decode_position(decodedData,15) - BATT_0) / (BATT_100 - BATT_0))
-        battery = min(max(0, battery), 100)
-        device.sensors["battery"] = battery
+        # The free chlorine estimate is added by derived.DerivedMetrics.
 
-        ec = self.decode_position(decodedData,5)
-        device.sensors["EC"] = ec
-        device.sensors["salt"] = ec * 0.55
-        
-        device.sensors["TDS"] = self.decode_position(decodedData,7)
-        
-        cloro = self.decode_position(decodedData,11)
-        if cloro < 0:
-          device.sensors["cloro"] = 0
-        else:
-          device.sensors["cloro"] = cloro / 10.0
-
-        device.sensors["pH"] = self.decode_position(decodedData,3) / 100.0 
-		
-        device.sensors["ORP"] = self.decode_position(decodedData,20) / 1000.0
-		
-        device.sensors["temperature"] = self.decode_position(decodedData,13) / 10.0
-        
-        #fcAdjust = 0 
-        #device.sensors["freeChlorine"] = round( 0.23 * (1 - fcAdjust) * (14 - ph) ** (1/(400 - orp))*(ph - 4.1) ** ( (orp - 516)/145) + 10.0 ** ( (orp + ph * 70 - 1282 ) / 40 ), 1 );  
-        
-        _LOGGER.debug("Got Status")
         return device
 
-    
-    async def update_device(self, ble_device: BLEDevice) -> C600Device:
+    def update_from_advertisement(
+        self,
+        address: str,
+        manufacturer_data: dict[int, bytes],
+        service_data: dict[str, bytes],
+    ) -> C600Device | None:
+        """Decode readings carried in an advertisement, if there are any.
+
+        Stock firmware is not known to advertise readings, so this only
+        accepts payloads long enough to hold a full frame that passes
+        validation.
+        """
+        for payload in (*manufacturer_data.values(), *service_data.values()):
+            if len(payload) < FRAME_LENGTH:
+                continue
+            device = self._device
+            try:
+                with self.timings.measure("decode"):
+                    self._decode_into(payload, device)
+            except InvalidFrameError:
+                continue
+            # Other advertisements only fill the capture with noise, so
+            # unlike reads and notifications only valid frames are kept.
+            if self.capture is not None:
+                self.capture.append(payload)
+            device.name = address
+            device.address = address
+            return device
+        return None
+
+    async def _connect(self, ble_device: BLEDevice, **kwargs: Any) -> BleakClient:
+        """Connect reusing the services discovered on a previous connection."""
+        # establish_connection gives every attempt its own timeout, the
+        # configured one is the time allowed for all of them together.
+        async with asyncio.timeout(self.connect_timeout):
+            client = await establish_connection(
+                BleakClientWithServiceCache,
+                ble_device,
+                ble_device.address,
+                max_attempts=self.max_attempts,
+                cached_services=self._services,
+                **kwargs,
+            )
+        if client.services is not self._services:
+            self._services = client.services
+            self._read_char = client.services.get_characteristic(READ_UUID)
+        return client
+
+    def clear_cache(self) -> None:
+        """Forget the cached services, for example after a failed read."""
+        self._services = None
+        self._read_char = None
+
+    async def update_device(
+        self,
+        ble_device: BLEDevice,
+        ble_device_callback: Callable[[], BLEDevice] | None = None,
+    ) -> C600Device:
         """Connects to the device through BLE and retrieves relevant data"""
+        with self.timings.measure("total"):
+            return await self._update_device(ble_device, ble_device_callback)
+
+    async def _update_device(
+        self,
+        ble_device: BLEDevice,
+        ble_device_callback: Callable[[], BLEDevice] | None,
+    ) -> C600Device:
         _LOGGER.debug("Update Device")
-        client = await establish_connection(BleakClient, ble_device, ble_device.address)
+        with self.timings.measure("connect"):
+            client = await self._connect(ble_device, ble_device_callback=ble_device_callback)
         _LOGGER.debug("Got Client")
         #await client.pair()
-        device = C600Device()
-        _LOGGER.debug("Made Device")
-        
-        device = await self._get_status(client, device)
+        device = self._device
+
+        try:
+            device = await self._get_status(client, device)
+        except BleakError:
+            self.clear_cache()
+            await client.clear_cache()
+            raise
+        finally:
+            with self.timings.measure("disconnect"):
+                await client.disconnect()
         _LOGGER.debug("got Status")
         device.name = ble_device.address
         device.address = ble_device.address
         _LOGGER.debug("device.name: %s", device.name)
         _LOGGER.debug("device.address: %s", device.address)
 
-        await client.disconnect()
-
         return device
-																	 
+
+    async def async_start(
+        self,
+        ble_device_callback: Callable[[], BLEDevice | None],
+        data_callback: Callable[[C600Device], None],
+        poll_interval: float,
+        connection_slot: Callable[[], AbstractAsyncContextManager[Any]] = nullcontext,
+    ) -> None:
+        """Keep a connection open and push every new reading to data_callback.
+
+        Notifications are used when the characteristic supports them, otherwise
+        the characteristic is read every poll_interval seconds over the open
+        connection. The connection is re-established when it drops. Every
+        connection is made and held within ``connection_slot()``.
+        """
+        await self.async_stop()
+        self._listen_task = asyncio.create_task(
+            self._listen(
+                ble_device_callback, data_callback, poll_interval, connection_slot
+            )
+        )
+
+    async def async_stop(self) -> None:
+        """Stop the persistent connection."""
+        if self._listen_task is None:
+            return
+        self._listen_task.cancel()
+        try:
+            await self._listen_task
+        except asyncio.CancelledError:
+            pass
+        self._listen_task = None
+
+    @property
+    def is_listening(self) -> bool:
+        """Return True while a persistent connection is being maintained."""
+        return self._listen_task is not None and not self._listen_task.done()
+
+    async def _listen(
+        self,
+        ble_device_callback: Callable[[], BLEDevice | None],
+        data_callback: Callable[[C600Device], None],
+        poll_interval: float,
+        connection_slot: Callable[[], AbstractAsyncContextManager[Any]],
+    ) -> None:
+        delay = RECONNECT_DELAY
+        while True:
+            ble_device = ble_device_callback()
+            if ble_device is None:
+                _LOGGER.debug("Device not available, retrying in %s seconds", delay)
+            else:
+                try:
+                    async with connection_slot():
+                        await self._listen_once(
+                            ble_device, ble_device_callback, data_callback, poll_interval
+                        )
+                    delay = RECONNECT_DELAY
+                except (BleakError, asyncio.TimeoutError) as err:
+                    _LOGGER.debug("Connection to %s failed: %s", ble_device.address, err)
+                except Exception:  # pylint: disable=broad-except
+                    # Never let the listener end silently, reconnect instead.
+                    _LOGGER.exception(
+                        "Unexpected error on the connection to %s", ble_device.address
+                    )
+            # Jitter keeps devices that dropped together from reconnecting together.
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            self.timings.retries += 1
+
+    async def _listen_once(
+        self,
+        ble_device: BLEDevice,
+        ble_device_callback: Callable[[], BLEDevice | None],
+        data_callback: Callable[[C600Device], None],
+        poll_interval: float,
+    ) -> None:
+        """Serve one connection until it drops."""
+        disconnected = asyncio.Event()
+        with self.timings.measure("connect"):
+            client = await self._connect(
+                ble_device,
+                disconnected_callback=lambda _client: disconnected.set(),
+                ble_device_callback=ble_device_callback,
+            )
+        _LOGGER.debug("Persistent connection to %s established", ble_device.address)
+
+        device = self._device
+        device.name = ble_device.address
+        device.address = ble_device.address
+
+        def _notification_handler(_sender: Any, data: bytearray) -> None:
+            try:
+                data_callback(self._parse_frame(data, device))
+            except InvalidFrameError as err:
+                _LOGGER.debug("Dropping invalid notification: %s", err)
+
+        async def _read() -> None:
+            # Bad frames only cost this cycle, the connection stays up.
+            try:
+                data_callback(await self._get_status(client, device))
+            except InvalidFrameError as err:
+                _LOGGER.debug("Skipping a cycle with invalid frames: %s", err)
+
+        try:
+            characteristic = self._read_char
+            if characteristic is not None and "notify" in characteristic.properties:
+                await client.start_notify(characteristic, _notification_handler)
+                await _read()
+                await disconnected.wait()
+                return
+
+            while client.is_connected:
+                await _read()
+                try:
+                    await asyncio.wait_for(disconnected.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if client.is_connected:
+                await client.disconnect()
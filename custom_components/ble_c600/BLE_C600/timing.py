@@ -0,0 +1,95 @@
+"""Latency statistics of the phases of a C600 update"""
+
+from __future__ import annotations
+
+from collections import deque
+from time import perf_counter
+from typing import Any
+
+PHASES = ("lookup", "connect", "read", "decode", "disconnect", "total")
+
+# Samples kept per phase for the percentiles
+WINDOW = 256
+
+
+class PhaseStats:
+    """Rolling latency samples and failure count of one phase."""
+
+    __slots__ = ("samples", "count", "failures", "last")
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.failures = 0
+        self.last: float | None = None
+
+    def add(self, seconds: float) -> None:
+        """Record a successful run of the phase."""
+        self.samples.append(seconds)
+        self.count += 1
+        self.last = seconds
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a percentile of the recent samples in seconds."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> dict[str, Any]:
+        """Return p50/p95/max in milliseconds and the counters."""
+
+        def _ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "p50": _ms(self.percentile(0.5)),
+            "p95": _ms(self.percentile(0.95)),
+            "max": _ms(max(self.samples, default=None)),
+            "count": self.count,
+            "failures": self.failures,
+        }
+
+
+class _Measure:
+    """Time a phase, counting a failure when the block raises."""
+
+    __slots__ = ("_stats", "_start")
+
+    def __init__(self, stats: PhaseStats) -> None:
+        self._stats = stats
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self._stats.add(perf_counter() - self._start)
+        else:
+            self._stats.failures += 1
+
+
+class UpdateTimings:
+    """Per phase statistics of the updates of one device."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.phases = {phase: PhaseStats(window) for phase in PHASES}
+        self.retries = 0
+
+    def measure(self, phase: str) -> _Measure:
+        """Return a context manager timing ``phase``."""
+        return _Measure(self.phases[phase])
+
+    @property
+    def failures(self) -> int:
+        """Return the number of failed updates."""
+        return self.phases["total"].failures
+
+    def summary(self) -> dict[str, Any]:
+        """Return the statistics of all phases."""
+        return {
+            "retries": self.retries,
+            "failures": self.failures,
+            **{phase: stats.summary() for phase, stats in self.phases.items()},
+        }
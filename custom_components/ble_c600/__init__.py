@@ -1,20 +1,20 @@
 """The C600 BLE integration."""
 from __future__ import annotations
 
-from datetime import timedelta
 import logging
-
-from .BLE_C600 import C600BluetoothDeviceData
+import os
 
 from homeassistant.components import bluetooth
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.storage import Store
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
+from .cache import async_pop_reading
+from .const import DOMAIN, STORAGE_VERSION
+from .coordinator import C600DataUpdateCoordinator, frames_path
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
@@ -30,43 +30,72 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     is_metric = hass.config.units is METRIC_SYSTEM
     assert address is not None
 
-    ble_device = bluetooth.async_ble_device_from_address(hass, address)
-
-    if not ble_device:
-        raise ConfigEntryNotReady(f"Could not find C600 device with address {address}")
+    coordinator = C600DataUpdateCoordinator(hass, entry)
+    await coordinator.async_setup()
+
+    # A device that was just read by the config flow does not need a second
+    # connection before its entities can be set up.
+    # Otherwise the reading stored before the last restart is shown while the
+    # first poll runs in the background.
+    restored = False
+    if device := async_pop_reading(hass, address):
+        coordinator.async_push(device)
+    elif not (restored := await coordinator.async_restore()):
+        try:
+            ble_device = bluetooth.async_ble_device_from_address(hass, address)
 
-    async def _async_update_method():
-        """Get data from C600 BLE."""
-        ble_device = bluetooth.async_ble_device_from_address(hass, address)
-        c600 = C600BluetoothDeviceData(_LOGGER)
+            if not ble_device:
+                raise ConfigEntryNotReady(
+                    f"Could not find C600 device with address {address}"
+                )
 
-        try:
-            data = await c600.update_device(ble_device)
-        except Exception as err:
-            raise UpdateFailed(f"Unable to fetch data: {err}") from err
-
-        return data
-        
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=_async_update_method,
-        update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
-    )
-
-    await coordinator.async_config_entry_first_refresh()
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_stop()
+            raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    await coordinator.async_start()
+    entry.async_on_unload(coordinator.async_stop)
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
+
+    # A device that is not advertising yet is polled once it shows up.
+    if restored and coordinator.in_range and not coordinator.persistent:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {address}"
+        )
+
     return True
 
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply new options to the running coordinator."""
+    coordinator: C600DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_apply_options(entry.options)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored reading and frame capture of a deleted config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+    if entry.unique_id is not None:
+        await hass.async_add_executor_job(
+            _remove_file, frames_path(hass, entry.unique_id)
+        )
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
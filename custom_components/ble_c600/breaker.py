@@ -0,0 +1,89 @@
+"""Backoff and circuit breaker for unreachable C600 devices."""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+STATES = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+
+
+class CircuitBreaker:
+    """Space out connection attempts to a device that keeps failing.
+
+    Every failure doubles the wait before the next attempt, starting at
+    ``base`` seconds and never exceeding ``cap``, with a random jitter so
+    devices failing together do not retry together. After ``threshold``
+    failures in a row the breaker opens: no attempt is made until it is
+    re-armed by the device advertising again or ``cap`` seconds passed. The
+    attempt that follows (half open) closes it on success and opens it again
+    on failure.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        base: float,
+        cap: float,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+        self.state = STATE_CLOSED
+        self._retry_at: float | None = None
+        self._random = rng or random.Random()
+
+    def allow(self, now: float) -> bool:
+        """Return whether a connection may be attempted at ``now``."""
+        if self._retry_at is None or now >= self._retry_at:
+            if self.state == STATE_OPEN:
+                self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    def retry_in(self, now: float) -> float | None:
+        """Return the seconds until the next attempt is allowed, if waiting."""
+        if self._retry_at is None or now >= self._retry_at:
+            return None
+        return self._retry_at - now
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful update."""
+        self.failures = 0
+        self.state = STATE_CLOSED
+        self._retry_at = None
+
+    def record_failure(self, now: float) -> float:
+        """Count a failed attempt and return the seconds to wait before the next."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.threshold:
+            self.state = STATE_OPEN
+            delay = self.cap
+        else:
+            delay = min(self.cap, self.base * 2 ** (self.failures - 1))
+        # Equal jitter: wait at least half of the delay.
+        delay = self._random.uniform(delay / 2, delay)
+        self._retry_at = now + delay
+        return delay
+
+    def rearm(self) -> bool:
+        """Allow an attempt right away if the breaker is open."""
+        if self.state != STATE_OPEN:
+            return False
+        self.state = STATE_HALF_OPEN
+        self._retry_at = None
+        return True
+
+    def stats(self, now: float) -> dict[str, Any]:
+        """Return the state of the breaker."""
+        retry_in = self.retry_in(now)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": None if retry_in is None else round(retry_in, 1),
+        }
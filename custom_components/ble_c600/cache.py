@@ -0,0 +1,41 @@
+"""Short lived cache of readings taken while setting up C600 devices."""
+from __future__ import annotations
+
+import dataclasses
+import time
+
+from .BLE_C600 import C600Device
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_DISCOVERY_CACHE, DISCOVERY_CACHE_TTL
+
+
+@callback
+def async_store_reading(hass: HomeAssistant, device: C600Device) -> None:
+    """Remember a fresh reading so setup does not have to connect again."""
+    cache: dict[str, tuple[float, C600Device]] = hass.data.setdefault(
+        DATA_DISCOVERY_CACHE, {}
+    )
+    now = time.monotonic()
+    for address, (stored, _device) in list(cache.items()):
+        if now - stored > DISCOVERY_CACHE_TTL:
+            del cache[address]
+    # Store the reading the way a coordinator poll returns it, the identifier
+    # is part of the entity unique ids and polls leave it empty.
+    cache[device.address] = (
+        now,
+        dataclasses.replace(device, identifier="", sensors=dict(device.sensors)),
+    )
+
+
+@callback
+def async_pop_reading(hass: HomeAssistant, address: str) -> C600Device | None:
+    """Return and forget the reading of a device if it is still fresh."""
+    cache: dict[str, tuple[float, C600Device]] = hass.data.get(DATA_DISCOVERY_CACHE, {})
+    if (entry := cache.pop(address, None)) is None:
+        return None
+    stored, device = entry
+    if time.monotonic() - stored > DISCOVERY_CACHE_TTL:
+        return None
+    return device
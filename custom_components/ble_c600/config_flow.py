@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import dataclasses
 import logging
 from typing import Any
@@ -15,11 +16,34 @@ from homeassistant.components.bluetooth import (
     BluetoothServiceInfo,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow
-from homeassistant.const import CONF_ADDRESS
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
+from homeassistant.const import CONF_ADDRESS, CONF_SCAN_INTERVAL, CONF_TIMEOUT
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN
+from .cache import async_store_reading
+from .const import (
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_EXPORT,
+    CONF_EXPORT_FLUSH_AGE,
+    CONF_EXPORT_FLUSH_SIZE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_RETRY_COUNT,
+    DEFAULT_ADAPTIVE_INTERVAL,
+    DEFAULT_EXPORT,
+    DEFAULT_EXPORT_FLUSH_AGE,
+    DEFAULT_EXPORT_FLUSH_SIZE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_RETRY_COUNT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    PROBE_TIMEOUT,
+)
+from .scheduler import async_get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +55,7 @@ class Discovery:
     name: str
     discovery_info: BluetoothServiceInfo
     device: C600Device
+    verified: bool = True
 
 
 def get_name(device: C600Device) -> str:
@@ -48,6 +73,12 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> C600OptionsFlow:
+        """Return the options flow."""
+        return C600OptionsFlow(config_entry)
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._discovered_device: Discovery | None = None
@@ -75,6 +106,7 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
             data.name = discovery_info.address
             data.address = discovery_info.address
             data.identifier = discovery_info.advertisement.local_name
+            async_store_reading(self.hass, data)
         except BleakError as err:
             _LOGGER.error(
                 "Error connecting to and getting data from %s: %s",
@@ -89,6 +121,34 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
             raise err
         return data
 
+    async def _probe(self, discovery_info: BluetoothServiceInfo) -> Discovery:
+        """Read a candidate device, sharing connection slots with the fleet.
+
+        Devices that cannot be read in time are still offered, marked as
+        unverified, instead of aborting the whole flow.
+        """
+        scheduler = async_get_scheduler(self.hass)
+        try:
+            # The wait for a slot counts, running polls may hold them all.
+            async with asyncio.timeout(PROBE_TIMEOUT), scheduler.async_slot(
+                discovery_info.address, discovery_info.source
+            ):
+                device = await self._get_device_data(discovery_info)
+        except (C600DeviceUpdateError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Cannot Connect to %s: %s", discovery_info.address, err)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Cannot Connect to %s - Unknown", discovery_info.address)
+        else:
+            _LOGGER.debug("Getting Name")
+            return Discovery(get_name(device), discovery_info, device)
+
+        device = C600Device(
+            name=discovery_info.address,
+            identifier=discovery_info.advertisement.local_name or "",
+            address=discovery_info.address,
+        )
+        return Discovery(get_name(device), discovery_info, device, verified=False)
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfo
     ) -> FlowResult:
@@ -144,6 +204,7 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
             return self.async_create_entry(title=discovery.name, data={})
 
         current_addresses = self._async_current_ids()
+        candidates: list[BluetoothServiceInfo] = []
         for discovery_info in async_discovered_service_info(self.hass):
             address = discovery_info.address
             if address in current_addresses or address in self._discovered_devices:
@@ -170,24 +231,20 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
             _LOGGER.debug(
                 "C600 advertisement: %s", discovery_info.advertisement.local_name
             )
-            try:
-                device = await self._get_device_data(discovery_info)
-                _LOGGER.debug("Getting Device Data")
-            except C600DeviceUpdateError:
-                _LOGGER.debug("Cannot Connect")
-                return self.async_abort(reason="cannot_connect")
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.debug("Cannot Connect - Unknown")
-                return self.async_abort(reason="unknown")
-            _LOGGER.debug("Getting Name")
-            name = get_name(device)
-            self._discovered_devices[address] = Discovery(name, discovery_info, device)
+            candidates.append(discovery_info)
+
+        for discovery in await asyncio.gather(
+            *(self._probe(discovery_info) for discovery_info in candidates)
+        ):
+            self._discovered_devices[discovery.discovery_info.address] = discovery
 
         if not self._discovered_devices:
             return self.async_abort(reason="no_devices_found")
 
         titles = {
-            address: get_name(discovery.device)
+            address: discovery.name
+            if discovery.verified
+            else f"{discovery.name} (unverified)"
             for (address, discovery) in self._discovered_devices.items()
         }
         return self.async_show_form(
@@ -198,3 +255,89 @@ class C600ConfigFlow(ConfigFlow, domain=DOMAIN):
                 },
             ),
         )
+
+
+class C600OptionsFlow(OptionsFlow):
+    """Handle the connection options of a C600 device."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options, they apply without a reload."""
+        options = self._entry.options
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                # Keep the options this form does not show.
+                data = {**options, **user_input}
+                # An emptied time limit is left out of the input, remove it.
+                if CONF_TIMEOUT not in user_input:
+                    data.pop(CONF_TIMEOUT, None)
+                return self.async_create_entry(title="", data=data)
+            options = {**options, **user_input}
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                    vol.Optional(
+                        CONF_TIMEOUT,
+                        description={"suggested_value": options.get(CONF_TIMEOUT)},
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                    vol.Required(
+                        CONF_RETRY_COUNT,
+                        default=options.get(CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                    vol.Required(
+                        CONF_PERSISTENT_CONNECTION,
+                        default=options.get(
+                            CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_ADAPTIVE_INTERVAL,
+                        default=options.get(
+                            CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                    vol.Required(
+                        CONF_EXPORT, default=options.get(CONF_EXPORT, DEFAULT_EXPORT)
+                    ): bool,
+                    vol.Required(
+                        CONF_EXPORT_FLUSH_SIZE,
+                        default=options.get(
+                            CONF_EXPORT_FLUSH_SIZE, DEFAULT_EXPORT_FLUSH_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+                    vol.Required(
+                        CONF_EXPORT_FLUSH_AGE,
+                        default=options.get(
+                            CONF_EXPORT_FLUSH_AGE, DEFAULT_EXPORT_FLUSH_AGE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                }
+            ),
+            errors=errors,
+        )
@@ -3,3 +3,96 @@
 DOMAIN = "ble_c600"
 
 DEFAULT_SCAN_INTERVAL = 60
+
+CONF_PERSISTENT_CONNECTION = "persistent_connection"
+DEFAULT_PERSISTENT_CONNECTION = False
+
+# Concurrent connections allowed through one adapter or proxy
+MAX_CONNECTIONS_PER_SOURCE = 2
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+CONF_ADAPTIVE_INTERVAL = "adaptive_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_ADAPTIVE_INTERVAL = False
+DEFAULT_MIN_SCAN_INTERVAL = 60
+DEFAULT_MAX_SCAN_INTERVAL = 1800
+
+# Changes between two readings smaller than these count as stable
+ADAPTIVE_BANDS = {
+    "pH": 0.05,
+    "ORP": 0.01,
+    "EC": 20,
+    "temperature": 0.2,
+}
+
+# Seconds allowed for reading a device while setting it up, including the
+# wait for a connection slot
+PROBE_TIMEOUT = 45
+
+# Seconds a reading taken by the config flow is used as initial data
+DISCOVERY_CACHE_TTL = 300
+
+DATA_DISCOVERY_CACHE = f"{DOMAIN}_discovery_cache"
+
+# Sensor state is only written when it moves more than its deadband from the
+# last written value, plus the hysteresis when the direction reverses.
+SENSOR_DEADBANDS = {
+    "pH": 0.02,
+    "temperature": 0.1,
+    "ORP": 0.005,
+    "EC": 5,
+    "salt": 3,
+    "TDS": 3,
+    "cloro": 0.1,
+    "battery": 1,
+    "freeChlorine": 0.1,
+}
+SENSOR_HYSTERESIS = {
+    "pH": 0.01,
+    "temperature": 0.05,
+    "ORP": 0.002,
+}
+# Seconds after which the state is written even if it did not change
+MAX_STATE_SILENCE = 3600
+
+# Raw frames kept per device for the diagnostics download
+CAPTURE_FRAMES = 1024
+
+# Sensors that get EMA, rolling min/max/mean and rate of change sensors
+DERIVED_SENSORS = ("pH", "ORP", "temperature", "cloro")
+# Seconds covered by the rolling min/max/mean
+DERIVED_WINDOW = 24 * 3600
+# Time constant of the exponential moving average in seconds
+DERIVED_EMA_TIME_CONSTANT = 3600
+
+# Version of the stored last reading of each entry
+STORAGE_VERSION = 1
+# Seconds to wait before writing the last reading to storage
+STORAGE_SAVE_DELAY = 60
+
+# Failed connections in a row before the circuit breaker opens
+BREAKER_THRESHOLD = 5
+# Wait after the first failed connection in seconds, doubled on every failure
+BACKOFF_BASE = 30
+# Longest wait between connection attempts in seconds
+BACKOFF_CAP = 1800
+
+CONF_EXPORT = "export"
+CONF_EXPORT_FLUSH_SIZE = "export_flush_size"
+CONF_EXPORT_FLUSH_AGE = "export_flush_age"
+DEFAULT_EXPORT = False
+# Readings buffered before they are written to the export file
+DEFAULT_EXPORT_FLUSH_SIZE = 100
+# Seconds a reading may wait in the buffer
+DEFAULT_EXPORT_FLUSH_AGE = 300
+
+CONF_RETRY_COUNT = "retry_count"
+# Connection attempts per update, each gets the 20 seconds of
+# bleak_retry_connector. CONF_TIMEOUT optionally limits all of them together.
+DEFAULT_RETRY_COUNT = 4
+
+DATA_PUBLISHER = f"{DOMAIN}_publisher"
+# Seconds readings of all devices are collected before entities are updated
+PUBLISH_WINDOW = 0.05
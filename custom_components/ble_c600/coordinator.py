@@ -0,0 +1,446 @@
+"""Data update coordinator for C600 BLE."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from contextlib import AbstractAsyncContextManager
+import dataclasses
+from datetime import timedelta
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from .BLE_C600 import C600Device
+from .BLE_C600.parser import C600BluetoothDeviceData
+from .BLE_C600.capture import FrameRing
+from .BLE_C600.derived import DerivedMetrics
+
+from homeassistant.components import bluetooth
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TIMEOUT
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .breaker import CircuitBreaker
+from .const import (
+    BACKOFF_BASE,
+    BACKOFF_CAP,
+    BREAKER_THRESHOLD,
+    CAPTURE_FRAMES,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_EXPORT,
+    CONF_EXPORT_FLUSH_AGE,
+    CONF_EXPORT_FLUSH_SIZE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_RETRY_COUNT,
+    DEFAULT_ADAPTIVE_INTERVAL,
+    DEFAULT_EXPORT,
+    DEFAULT_EXPORT_FLUSH_AGE,
+    DEFAULT_EXPORT_FLUSH_SIZE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_RETRY_COUNT,
+    DEFAULT_SCAN_INTERVAL,
+    DERIVED_EMA_TIME_CONSTANT,
+    DERIVED_SENSORS,
+    DERIVED_WINDOW,
+    DOMAIN,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .export import ReadingExporter
+from .interval import AdaptiveInterval
+from .paths import PathSelector
+from .publisher import async_get_publisher
+from .scheduler import async_get_scheduler
+
+if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _adaptive_bounds(options: Mapping[str, Any]) -> tuple[int, int] | None:
+    """Return the bounds of the adaptive interval, or None when it is off."""
+    if not options.get(CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL):
+        return None
+    return (
+        options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+        options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+    )
+
+
+def _export_settings(options: Mapping[str, Any]) -> tuple[int, int] | None:
+    """Return the flush size and age of the export, or None when it is off."""
+    if not options.get(CONF_EXPORT, DEFAULT_EXPORT):
+        return None
+    return (
+        options.get(CONF_EXPORT_FLUSH_SIZE, DEFAULT_EXPORT_FLUSH_SIZE),
+        options.get(CONF_EXPORT_FLUSH_AGE, DEFAULT_EXPORT_FLUSH_AGE),
+    )
+
+
+def frames_path(hass: HomeAssistant, address: str) -> str:
+    """Return the file holding the raw frame capture of a device."""
+    return hass.config.path(
+        STORAGE_DIR, f"{DOMAIN}.{address.replace(':', '').lower()}.frames"
+    )
+
+
+class C600DataUpdateCoordinator(DataUpdateCoordinator[C600Device]):
+    """Coordinate readings of a single C600 device."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        assert entry.unique_id is not None
+        self.address = entry.unique_id
+        self.persistent = entry.options.get(
+            CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+        )
+        self.c600 = C600BluetoothDeviceData(_LOGGER)
+        self._ble_device: BLEDevice | None = None
+        self._path: str | None = None
+        self.paths = PathSelector()
+        self._scan_interval: float = entry.options.get(
+            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+        )
+        self.c600.connect_timeout = entry.options.get(CONF_TIMEOUT)
+        self.c600.max_attempts = entry.options.get(
+            CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT
+        )
+        self.adaptive: AdaptiveInterval | None = None
+        self._async_set_adaptive(_adaptive_bounds(entry.options))
+        self.scheduler = async_get_scheduler(hass)
+        self.publisher = async_get_publisher(hass)
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BACKOFF_BASE, BACKOFF_CAP)
+        self.in_range = bluetooth.async_address_present(
+            hass, self.address, connectable=False
+        )
+        self.last_seen: float | None = None
+        self.rssi: int | None = None
+        self.source: str | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+        self.derived = DerivedMetrics(
+            DERIVED_SENSORS, DERIVED_WINDOW, DERIVED_EMA_TIME_CONSTANT
+        )
+        self.exporter = self._create_exporter(hass, _export_settings(entry.options))
+        self.scheduler.async_register(self.address)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            # Persistent connections push their readings, no polling needed.
+            update_interval=None
+            if self.persistent
+            else timedelta(seconds=self._scan_interval),
+        )
+
+    @callback
+    def _async_ble_device(self) -> BLEDevice | None:
+        """Look up the BLEDevice of the best connection path and cache it."""
+        devices = {
+            device.scanner.source: device
+            for device in bluetooth.async_scanner_devices_by_address(
+                self.hass, self.address, connectable=True
+            )
+        }
+        self._path = self.paths.choose(
+            (source, device.advertisement.rssi) for source, device in devices.items()
+        )
+        self._ble_device = None if self._path is None else devices[self._path].ble_device
+        return self._ble_device
+
+    @callback
+    def _async_path_device(self, source: str | None) -> BLEDevice | None:
+        """Return the BLEDevice of the device as seen through ``source``."""
+        for device in bluetooth.async_scanner_devices_by_address(
+            self.hass, self.address, connectable=True
+        ):
+            if device.scanner.source == source:
+                return device.ble_device
+        return None
+
+    @callback
+    def _async_listener_slot(self) -> AbstractAsyncContextManager[None]:
+        """Hold a slot of the current path for as long as the listener is connected."""
+        return self.scheduler.async_slot(self.address, self._path)
+
+    async def _async_update_data(self) -> C600Device:
+        """Get data from C600 BLE."""
+        if not self.in_range:
+            raise UpdateFailed(f"C600 device with address {self.address} is out of range")
+        if not self.breaker.allow(time.monotonic()):
+            raise UpdateFailed(
+                f"Not connecting to {self.address} after {self.breaker.failures} failures"
+            )
+
+        timings = self.c600.timings
+        if not self.last_update_success:
+            timings.retries += 1
+        with timings.measure("lookup"):
+            ble_device = self._ble_device or self._async_ble_device()
+        if ble_device is None:
+            raise UpdateFailed(f"Could not find C600 device with address {self.address}")
+
+        path = self._path
+
+        @callback
+        def _path_device() -> BLEDevice:
+            # Retries stay on the path the slot was taken for.
+            return self._async_path_device(path) or ble_device
+
+        try:
+            async with self.scheduler.async_slot(self.address, path):
+                data = await self.c600.update_device(
+                    ble_device, ble_device_callback=_path_device
+                )
+        except Exception as err:
+            if path is not None:
+                self.paths.record(path, False)
+            # The device may have moved to another adapter or proxy.
+            self._ble_device = None
+            delay = self.breaker.record_failure(time.monotonic())
+            _LOGGER.debug(
+                "Update of %s failed %s times, circuit %s, next attempt in %.0f seconds",
+                self.address,
+                self.breaker.failures,
+                self.breaker.state,
+                delay,
+            )
+            self._async_schedule_next_poll()
+            raise UpdateFailed(f"Unable to fetch data: {err}") from err
+
+        self.breaker.record_success()
+        if path is not None:
+            self.paths.record(path, True, timings.phases["connect"].last)
+        self._async_process(data)
+        if self.adaptive is not None:
+            self._base_interval = self.adaptive.update(data.sensors)
+        self._async_schedule_next_poll()
+        return data
+
+    @callback
+    def async_push(self, data: C600Device) -> None:
+        """Publish a reading that did not come from a poll."""
+        self._async_process(data)
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Let the publisher update the entities, batched with other devices."""
+        self.publisher.async_schedule(self)
+
+    @callback
+    def _async_process(self, data: C600Device) -> None:
+        """Add the derived values to a new reading, store and export it."""
+        self.derived.update(data.sensors, time.monotonic())
+        self._async_save(data)
+        if self.exporter is not None:
+            self.exporter.async_add(data.sensors)
+
+    @callback
+    def _async_save(self, data: C600Device) -> None:
+        """Store the reading so it can be shown right away after a restart."""
+        self._store.async_delay_save(lambda: dataclasses.asdict(data), STORAGE_SAVE_DELAY)
+
+    async def async_restore(self) -> bool:
+        """Publish the reading stored before the last restart, if there is one."""
+        try:
+            stored = await self._store.async_load()
+        except HomeAssistantError as err:
+            _LOGGER.debug("Could not restore the last reading of %s: %s", self.address, err)
+            return False
+        if not stored:
+            return False
+        try:
+            device = C600Device(**stored)
+        except TypeError as err:
+            _LOGGER.debug("Ignoring the stored reading of %s: %s", self.address, err)
+            return False
+        self.async_set_updated_data(device)
+        return True
+
+    def _create_exporter(
+        self, hass: HomeAssistant, settings: tuple[int, int] | None
+    ) -> ReadingExporter | None:
+        if settings is None:
+            return None
+        return ReadingExporter(
+            hass,
+            hass.config.path(DOMAIN, f"{self.address.replace(':', '').lower()}.csv"),
+            *settings,
+        )
+
+    @property
+    def _export_settings(self) -> tuple[int, int] | None:
+        if self.exporter is None:
+            return None
+        return self.exporter.flush_size, self.exporter.flush_age
+
+    @property
+    def _adaptive_bounds(self) -> tuple[int, int] | None:
+        if self.adaptive is None:
+            return None
+        return self.adaptive.minimum, self.adaptive.maximum
+
+    @callback
+    def _async_set_adaptive(self, bounds: tuple[int, int] | None) -> None:
+        """Turn the adaptive interval on or off, or change its bounds."""
+        if bounds != self._adaptive_bounds:
+            self.adaptive = None if bounds is None else AdaptiveInterval(*bounds)
+        elif self.adaptive is not None:
+            return
+        # Start again from the configured interval until the next reading.
+        self._base_interval = self._scan_interval
+
+    @callback
+    def _async_schedule_next_poll(self) -> None:
+        """Keep the next poll aligned with the phase of this device."""
+        if self.persistent:
+            return
+        delay = self.scheduler.next_delay(self.address, self._base_interval)
+        # Unreachable devices wait for their backoff.
+        if (retry_in := self.breaker.retry_in(time.monotonic())) is not None:
+            delay = max(delay, retry_in)
+        self.update_interval = timedelta(seconds=delay)
+
+    @callback
+    def _async_handle_advertisement(
+        self,
+        service_info: bluetooth.BluetoothServiceInfoBleak,
+        change: bluetooth.BluetoothChange,
+    ) -> None:
+        """Track the device and poll right away when it comes back in range."""
+        reappeared = not self.in_range
+        self.in_range = True
+        self.last_seen = time.monotonic()
+        self.rssi = service_info.rssi
+        if service_info.source != self.source:
+            # Resolve the BLEDevice again so the next poll uses the new path.
+            self.source = service_info.source
+            self._ble_device = None
+
+        if device := self.c600.update_from_advertisement(
+            self.address, service_info.manufacturer_data, service_info.service_data
+        ):
+            self.async_push(device)
+            return
+
+        if reappeared and not self.persistent:
+            _LOGGER.debug("%s is back in range, polling now", self.address)
+            self.breaker.rearm()
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_handle_unavailable(
+        self, service_info: bluetooth.BluetoothServiceInfoBleak
+    ) -> None:
+        """Stop polling a device that is no longer advertising."""
+        _LOGGER.debug("%s is out of range", self.address)
+        self.in_range = False
+
+    async def async_setup(self) -> None:
+        """Open the raw frame capture of the device."""
+        path = frames_path(self.hass, self.address)
+        try:
+            self.c600.capture = await self.hass.async_add_executor_job(
+                FrameRing.open, path, CAPTURE_FRAMES
+            )
+        except OSError as err:
+            _LOGGER.warning("Keeping raw frames of %s in memory only: %s", self.address, err)
+            self.c600.capture = FrameRing(CAPTURE_FRAMES)
+
+    async def async_start(self) -> None:
+        """Follow advertisements and open the persistent connection when enabled."""
+        self._unsubs.append(
+            bluetooth.async_register_callback(
+                self.hass,
+                self._async_handle_advertisement,
+                bluetooth.BluetoothCallbackMatcher(address=self.address),
+                bluetooth.BluetoothScanningMode.PASSIVE,
+            )
+        )
+        self._unsubs.append(
+            bluetooth.async_track_unavailable(
+                self.hass, self._async_handle_unavailable, self.address, connectable=False
+            )
+        )
+        if self.exporter is not None:
+            self.exporter.async_start()
+        if not self.persistent:
+            return
+        await self.c600.async_start(
+            self._async_ble_device,
+            self.async_push,
+            self._scan_interval,
+            self._async_listener_slot,
+        )
+
+    async def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options without reloading the entry."""
+        self.c600.connect_timeout = options.get(CONF_TIMEOUT)
+        self.c600.max_attempts = options.get(CONF_RETRY_COUNT, DEFAULT_RETRY_COUNT)
+        scan_interval = options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        persistent = options.get(
+            CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+        )
+        if (export := _export_settings(options)) != self._export_settings:
+            # Write what the old exporter buffered before replacing it.
+            if self.exporter is not None:
+                await self.exporter.async_stop()
+            self.exporter = self._create_exporter(self.hass, export)
+            if self.exporter is not None:
+                self.exporter.async_start()
+        adaptive_bounds = _adaptive_bounds(options)
+        connection = (scan_interval, persistent)
+        if (*connection, adaptive_bounds) == (
+            self._scan_interval,
+            self.persistent,
+            self._adaptive_bounds,
+        ):
+            return
+
+        # The listener only needs a restart when its own settings changed.
+        restart = self.persistent and connection != (self._scan_interval, self.persistent)
+        if restart:
+            await self.c600.async_stop()
+        was_persistent = self.persistent
+        self._scan_interval = scan_interval
+        self.persistent = persistent
+        self._async_set_adaptive(adaptive_bounds)
+        if persistent:
+            if restart or not was_persistent:
+                self.update_interval = None
+                # _schedule_refresh keeps the pending poll when there is no
+                # interval, it would connect next to the listener.
+                self._async_unsub_refresh()
+                await self.c600.async_start(
+                    self._async_ble_device,
+                    self.async_push,
+                    scan_interval,
+                    self._async_listener_slot,
+                )
+        else:
+            self._async_schedule_next_poll()
+            # Replace the pending poll with one at the new interval.
+            self._schedule_refresh()
+
+    async def async_stop(self) -> None:
+        """Close the persistent connection, leave the poll rotation and flush the export."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self.scheduler.async_unregister(self.address)
+        self.publisher.async_cancel(self)
+        await self.c600.async_stop()
+        if self.exporter is not None:
+            await self.exporter.async_stop()
+        if (capture := self.c600.capture) is not None:
+            self.c600.capture = None
+            await self.hass.async_add_executor_job(capture.close)
@@ -0,0 +1,59 @@
+"""Diagnostics support for C600 BLE."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import C600DataUpdateCoordinator
+
+TO_REDACT = {"address", "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: C600DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data
+
+    frames = []
+    if (capture := coordinator.c600.capture) is not None:
+        frames = [
+            {
+                "time": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                "raw": frame.hex(),
+                "decoded": coordinator.c600.decode(frame).hex(),
+            }
+            for timestamp, frame in capture.frames()
+        ]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "device": {
+            "in_range": coordinator.in_range,
+            "rssi": coordinator.rssi,
+            "source": coordinator.source,
+            "persistent": coordinator.persistent,
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "last_update_success": coordinator.last_update_success,
+            "sensors": data.sensors if data else None,
+        },
+        "timings": coordinator.c600.timings.summary(),
+        "scheduler": coordinator.scheduler.stats(),
+        "publisher": coordinator.publisher.stats(),
+        "breaker": coordinator.breaker.stats(time.monotonic()),
+        "paths": coordinator.paths.stats(),
+        "exported": None
+        if coordinator.exporter is None
+        else coordinator.exporter.written,
+        "frames_captured": capture.written if capture is not None else 0,
+        "frames": frames,
+    }
@@ -0,0 +1,87 @@
+"""Bulk export of C600 readings to CSV files."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .BLE_C600.export import RotatingCsvWriter, Row
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Readings kept in memory when the export file cannot be written
+MAX_PENDING = 10000
+
+
+class ReadingExporter:
+    """Buffer the readings of a device and append them to its CSV file in bulk.
+
+    The buffer is written once it holds ``flush_size`` readings or its oldest
+    reading is ``flush_age`` seconds old. Writing runs in the executor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, flush_size: int, flush_age: float
+    ) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.flush_size = flush_size
+        self.flush_age = flush_age
+        self.written = 0
+        self._writer = RotatingCsvWriter(path)
+        self._buffer: list[Row] = []
+        self._lock = asyncio.Lock()
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, sensors: Mapping[str, object]) -> None:
+        """Buffer a reading."""
+        self._buffer.append((time.time(), dict(sensors)))
+        if len(self._buffer) >= self.flush_size and not self._lock.locked():
+            self.hass.async_create_background_task(
+                self.async_flush(), f"{DOMAIN} export {self._writer.path}"
+            )
+
+    async def _async_flush_old(self, now: datetime) -> None:
+        if self._buffer and time.time() - self._buffer[0][0] >= self.flush_age:
+            await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the buffered readings."""
+        async with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                await self.hass.async_add_executor_job(self._writer.write, rows)
+            except OSError as err:
+                _LOGGER.warning(
+                    "Could not export readings to %s: %s", self._writer.path, err
+                )
+                # Keep them for the next attempt, within bounds.
+                self._buffer[:0] = rows[-MAX_PENDING:]
+                del self._buffer[:-MAX_PENDING]
+                return
+            self.written += len(rows)
+
+    @callback
+    def async_start(self) -> None:
+        """Check the age of the buffer regularly."""
+        self._unsub = async_track_time_interval(
+            self.hass,
+            self._async_flush_old,
+            timedelta(seconds=max(self.flush_age / 4, 1)),
+        )
+
+    async def async_stop(self) -> None:
+        """Write what is left in the buffer."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self.async_flush()
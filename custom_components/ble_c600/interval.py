@@ -0,0 +1,76 @@
+"""Adaptive poll interval for C600 BLE."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from .const import ADAPTIVE_BANDS
+
+# Growth of the interval after a stable reading
+BACKOFF_FACTOR = 1.5
+# A change this many times the band counts as fast and resets to the minimum
+FAST_CHANGE = 3.0
+# Below this battery level the interval is stretched, up to twice at 0 %
+LOW_BATTERY = 50
+
+
+class AdaptiveInterval:
+    """Derive the next poll interval from how much the readings move.
+
+    The interval grows while pH, ORP, EC and temperature stay within their
+    band of the previous reading, halves when any of them leaves its band
+    and drops to the minimum on fast changes. A low battery stretches the
+    result further. The outcome always stays within the configured bounds.
+    """
+
+    def __init__(
+        self,
+        minimum: float,
+        maximum: float,
+        bands: Mapping[str, float] = ADAPTIVE_BANDS,
+    ) -> None:
+        """Initialize the interval at its minimum."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.bands = bands
+        self._interval = float(minimum)
+        self._previous: dict[str, float] = {}
+
+    @property
+    def interval(self) -> float:
+        """Return the current interval before the battery adjustment."""
+        return self._interval
+
+    def change(self, sensors: Mapping[str, object]) -> float:
+        """Return the largest change since the last reading relative to its band."""
+        largest = 0.0
+        for key, band in self.bands.items():
+            value = sensors.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            previous = self._previous.get(key)
+            self._previous[key] = value
+            if previous is not None:
+                largest = max(largest, abs(value - previous) / band)
+        return largest
+
+    def update(self, sensors: Mapping[str, object]) -> float:
+        """Feed a new reading and return the interval until the next poll."""
+        change = self.change(sensors)
+        if change > FAST_CHANGE:
+            self._interval = self.minimum
+        elif change > 1:
+            self._interval /= 2
+        else:
+            self._interval *= BACKOFF_FACTOR
+        self._interval = min(max(self.minimum, self._interval), self.maximum)
+
+        interval = self._interval
+        battery = sensors.get("battery")
+        if isinstance(battery, (int, float)) and battery < LOW_BATTERY:
+            interval *= 1 + (LOW_BATTERY - max(battery, 0)) / LOW_BATTERY
+        return min(max(self.minimum, interval), self.maximum)
+
+    def reset(self) -> None:
+        """Forget the previous reading and go back to the minimum interval."""
+        self._interval = float(self.minimum)
+        self._previous.clear()
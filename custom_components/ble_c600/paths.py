@@ -0,0 +1,97 @@
+"""Choice of the adapter or proxy used to connect to a C600 device."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+# Weight of the newest sample in the moving averages
+SMOOTHING = 0.2
+# Connect time assumed for a path that never connected, in seconds
+DEFAULT_CONNECT_TIME = 5.0
+# Signal at which a path is not penalized, in dBm
+GOOD_RSSI = -70
+# Extra expected connect time per dB below GOOD_RSSI
+RSSI_PENALTY = 0.03
+
+
+class PathStats:
+    """Connect history of the device through one adapter or proxy."""
+
+    __slots__ = ("attempts", "successes", "success_rate", "connect_time")
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.successes = 0
+        # Start halfway so a single result does not decide.
+        self.success_rate = 0.5
+        self.connect_time: float | None = None
+
+    def add(self, success: bool, connect_time: float | None) -> None:
+        """Record the outcome of a connection."""
+        self.attempts += 1
+        self.success_rate += SMOOTHING * (float(success) - self.success_rate)
+        if not success:
+            return
+        self.successes += 1
+        if connect_time is not None:
+            if self.connect_time is None:
+                self.connect_time = connect_time
+            else:
+                self.connect_time += SMOOTHING * (connect_time - self.connect_time)
+
+    def cost(self, rssi: int | None) -> float:
+        """Return the expected time to get a connection through this path."""
+        connect_time = (
+            DEFAULT_CONNECT_TIME if self.connect_time is None else self.connect_time
+        )
+        if rssi is not None and rssi < GOOD_RSSI:
+            connect_time *= 1 + RSSI_PENALTY * (GOOD_RSSI - rssi)
+        # Failed attempts are retried, so the expected cost grows with them.
+        return connect_time / max(self.success_rate, 0.05)
+
+
+class PathSelector:
+    """Pick the path that connects to the device fastest and most reliably.
+
+    Paths are scored with the moving average of their connect time divided
+    by their moving success rate, penalized for a weak current signal. A path
+    without history is assumed to connect in DEFAULT_CONNECT_TIME half of the
+    time, so it gets tried once the known ones perform worse than that.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without history."""
+        self._paths: dict[str, PathStats] = {}
+
+    def _stats(self, source: str) -> PathStats:
+        if (stats := self._paths.get(source)) is None:
+            stats = self._paths[source] = PathStats()
+        return stats
+
+    def choose(self, candidates: Iterable[tuple[str, int | None]]) -> str | None:
+        """Return the best source out of (source, rssi) pairs."""
+        best: str | None = None
+        best_cost = 0.0
+        for source, rssi in candidates:
+            cost = self._stats(source).cost(rssi)
+            if best is None or cost < best_cost:
+                best, best_cost = source, cost
+        return best
+
+    def record(self, source: str, success: bool, connect_time: float | None = None) -> None:
+        """Record the outcome of a connection through ``source``."""
+        self._stats(source).add(success, connect_time)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the history of every path."""
+        return {
+            source: {
+                "attempts": stats.attempts,
+                "successes": stats.successes,
+                "success_rate": round(stats.success_rate, 3),
+                "connect_time": None
+                if stats.connect_time is None
+                else round(stats.connect_time, 3),
+            }
+            for source, stats in self._paths.items()
+        }
@@ -0,0 +1,90 @@
+"""Fleet wide publishing of C600 readings to the entities."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .BLE_C600.timing import PhaseStats
+from .const import DATA_PUBLISHER, PUBLISH_WINDOW
+
+if TYPE_CHECKING:
+    from .coordinator import C600DataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class C600Publisher:
+    """Update the entities of all C600 devices in batches.
+
+    Coordinators hand their updates to the publisher instead of notifying
+    their entities right away. Updates arriving within ``window`` seconds
+    are applied together in a single callback, so polls finishing in a
+    burst cost one pass of the event loop instead of one per device.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float = PUBLISH_WINDOW) -> None:
+        """Initialize the publisher."""
+        self.hass = hass
+        self.window = window
+        # Insertion ordered, a device updated twice is published once.
+        self._pending: dict[C600DataUpdateCoordinator, None] = {}
+        self._handle: asyncio.TimerHandle | asyncio.Handle | None = None
+        self.durations = PhaseStats()
+        self.devices = 0
+        self.largest = 0
+
+    @callback
+    def async_schedule(self, coordinator: C600DataUpdateCoordinator) -> None:
+        """Queue the listeners of ``coordinator`` for the next batch."""
+        self._pending[coordinator] = None
+        if self._handle is not None:
+            return
+        if self.window > 0:
+            self._handle = self.hass.loop.call_later(self.window, self._async_publish)
+        else:
+            self._handle = self.hass.loop.call_soon(self._async_publish)
+
+    @callback
+    def async_cancel(self, coordinator: C600DataUpdateCoordinator) -> None:
+        """Drop a pending update of a coordinator that is shutting down."""
+        self._pending.pop(coordinator, None)
+
+    @callback
+    def _async_publish(self) -> None:
+        """Update the entities of every queued device."""
+        self._handle = None
+        pending, self._pending = self._pending, {}
+        start = time.perf_counter()
+        for coordinator in pending:
+            DataUpdateCoordinator.async_update_listeners(coordinator)
+        elapsed = time.perf_counter() - start
+        self.durations.add(elapsed)
+        self.devices += len(pending)
+        self.largest = max(self.largest, len(pending))
+        _LOGGER.debug(
+            "Published %s devices in %.3f ms", len(pending), elapsed * 1000
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return batch statistics, durations in milliseconds."""
+        batches = self.durations.count
+        return {
+            "window": self.window,
+            "batches": batches,
+            "devices_per_batch": self.devices / batches if batches else 0.0,
+            "largest_batch": self.largest,
+            "duration": self.durations.summary(),
+        }
+
+
+@callback
+def async_get_publisher(hass: HomeAssistant) -> C600Publisher:
+    """Return the publisher shared by all C600 entries."""
+    if (publisher := hass.data.get(DATA_PUBLISHER)) is None:
+        publisher = hass.data[DATA_PUBLISHER] = C600Publisher(hass)
+    return publisher
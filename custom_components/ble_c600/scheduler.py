@@ -0,0 +1,153 @@
+"""Fleet wide poll scheduling for C600 BLE."""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+import logging
+import time
+from typing import Any, AsyncIterator
+
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SCHEDULER, MAX_CONNECTIONS_PER_SOURCE
+
+_LOGGER = logging.getLogger(__name__)
+
+UNKNOWN_SOURCE = "unknown"
+
+
+class C600PollScheduler:
+    """Share connection slots between all C600 devices.
+
+    Every adapter or proxy (the bluetooth "source") only gets a limited
+    number of concurrent connections, waiting polls are served first come
+    first served. Devices are also given evenly spread phases within their
+    poll interval, so they do not all connect at the same moment.
+    """
+
+    def __init__(self, hass: HomeAssistant, limit: int = MAX_CONNECTIONS_PER_SOURCE) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.limit = limit
+        self._epoch = time.monotonic()
+        self._addresses: list[str] = []
+        self._slots: dict[str, asyncio.Semaphore] = {}
+        self._waiting: defaultdict[str, int] = defaultdict(int)
+        self._active: defaultdict[str, int] = defaultdict(int)
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._last_wait: dict[str, float] = {}
+
+    @callback
+    def async_register(self, address: str) -> None:
+        """Add a device to the phase rotation."""
+        if address not in self._addresses:
+            self._addresses.append(address)
+            self._addresses.sort()
+
+    @callback
+    def async_unregister(self, address: str) -> None:
+        """Remove a device from the phase rotation."""
+        if address in self._addresses:
+            self._addresses.remove(address)
+        self._last_wait.pop(address, None)
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of scheduled devices."""
+        return len(self._addresses)
+
+    def phase(self, address: str) -> float:
+        """Return the phase of a device as a fraction of its interval."""
+        if address not in self._addresses:
+            return 0.0
+        return self._addresses.index(address) / len(self._addresses)
+
+    def next_delay(self, address: str, interval: float) -> float:
+        """Return the delay until the next poll that keeps the device in phase.
+
+        The delay is never shorter than half an interval, so a poll that was
+        held up in the queue does not cause an immediate second poll.
+        """
+        offset = self.phase(address) * interval
+        elapsed = time.monotonic() - self._epoch - offset
+        due = (elapsed // interval + 1) * interval
+        if due - elapsed < interval / 2:
+            due += interval
+        return due - elapsed
+
+    @callback
+    def async_source(self, address: str) -> str:
+        """Return the adapter or proxy currently serving the device."""
+        service_info = bluetooth.async_last_service_info(
+            self.hass, address, connectable=True
+        )
+        if service_info is None:
+            return UNKNOWN_SOURCE
+        return service_info.source
+
+    @asynccontextmanager
+    async def async_slot(self, address: str, source: str | None = None) -> AsyncIterator[None]:
+        """Hold one of the connection slots of the source serving the device."""
+        if source is None:
+            source = self.async_source(address)
+        slot = self._slots.get(source)
+        if slot is None:
+            slot = self._slots[source] = asyncio.Semaphore(self.limit)
+
+        start = time.monotonic()
+        self._waiting[source] += 1
+        try:
+            await slot.acquire()
+        finally:
+            self._waiting[source] -= 1
+        waited = time.monotonic() - start
+        self._record_wait(address, waited)
+        if waited > 1:
+            _LOGGER.debug(
+                "%s waited %.1f s for a connection slot on %s (%s still queued)",
+                address,
+                waited,
+                source,
+                self._waiting[source],
+            )
+
+        self._active[source] += 1
+        try:
+            yield
+        finally:
+            self._active[source] -= 1
+            slot.release()
+
+    def _record_wait(self, address: str, waited: float) -> None:
+        self._wait_count += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._last_wait[address] = waited
+
+    def last_wait(self, address: str) -> float | None:
+        """Return how long the last poll of the device waited for a slot."""
+        return self._last_wait.get(address)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue statistics."""
+        return {
+            "devices": len(self._addresses),
+            "limit_per_source": self.limit,
+            "queued": dict(self._waiting),
+            "active": dict(self._active),
+            "waits": self._wait_count,
+            "wait_mean": self._wait_total / self._wait_count if self._wait_count else 0.0,
+            "wait_max": self._wait_max,
+        }
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> C600PollScheduler:
+    """Return the scheduler shared by all C600 entries."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = C600PollScheduler(hass)
+    return scheduler
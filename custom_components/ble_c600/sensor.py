@@ -1,7 +1,11 @@
 """Support for C600 ble sensors."""
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import logging
+import time
+from typing import Any
 
 from .BLE_C600 import C600Device
 
@@ -15,11 +19,12 @@ from homeassistant.components.sensor import (
 from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     PERCENTAGE,
+    UnitOfTime,
     UnitOfTemperature,
     UnitOfElectricPotential,
     UnitOfConductivity,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -30,10 +35,21 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
-from .const import DOMAIN
+from .const import (
+    DERIVED_SENSORS,
+    DOMAIN,
+    MAX_STATE_SILENCE,
+    SENSOR_DEADBANDS,
+    SENSOR_HYSTERESIS,
+)
+from .breaker import STATES
+from .coordinator import C600DataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Float error allowed when comparing a change against its deadband
+DEADBAND_TOLERANCE = 1e-9
+
 SENSORS_MAPPING_TEMPLATE: dict[str, SensorEntityDescription] = {
     "EC": SensorEntityDescription(
         key="EC",
@@ -85,6 +101,13 @@ SENSORS_MAPPING_TEMPLATE: dict[str, SensorEntityDescription] = {
         native_unit_of_measurement=CONCENTRATION_PARTS_PER_MILLION,
         icon="mdi:chemical-weapon",
     ),
+    "freeChlorine": SensorEntityDescription(
+        key="freeChlorine",
+        name="Free Chlorine Estimate",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=CONCENTRATION_PARTS_PER_MILLION,
+        icon="mdi:chemical-weapon",
+    ),
     "temperature": SensorEntityDescription(
         key="temperature",
         name="Temperature",
@@ -95,6 +118,172 @@ SENSORS_MAPPING_TEMPLATE: dict[str, SensorEntityDescription] = {
     ),
 }
 
+_STATISTIC_NAMES = {
+    "ema": "smoothed",
+    "min": "minimum",
+    "max": "maximum",
+    "mean": "mean",
+}
+
+
+def _derived_descriptions() -> dict[str, SensorEntityDescription]:
+    """Describe the statistics sensors added by DerivedMetrics."""
+    descriptions = {}
+    for key in DERIVED_SENSORS:
+        base = SENSORS_MAPPING_TEMPLATE[key]
+        for statistic, label in _STATISTIC_NAMES.items():
+            descriptions[f"{key}_{statistic}"] = SensorEntityDescription(
+                key=f"{key}_{statistic}",
+                name=f"{base.name} {label}",
+                native_unit_of_measurement=base.native_unit_of_measurement,
+                state_class=SensorStateClass.MEASUREMENT,
+                device_class=base.device_class,
+                icon=base.icon,
+                entity_registry_enabled_default=False,
+            )
+        descriptions[f"{key}_rate"] = SensorEntityDescription(
+            key=f"{key}_rate",
+            name=f"{base.name} rate of change",
+            native_unit_of_measurement=f"{base.native_unit_of_measurement or base.name}/h",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:chart-line-variant",
+            entity_registry_enabled_default=False,
+        )
+    return descriptions
+
+
+SENSORS_MAPPING_TEMPLATE.update(_derived_descriptions())
+
+
+@dataclass(frozen=True, kw_only=True)
+class C600DiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reporting on the connection to the device."""
+
+    value_fn: Callable[[C600DataUpdateCoordinator], StateType]
+    attributes_fn: Callable[[C600DataUpdateCoordinator], dict[str, Any]] | None = None
+
+
+def _phase_sensor(phase: str, name: str) -> C600DiagnosticSensorEntityDescription:
+    """Describe the median latency of an update phase, with p95/max as attributes."""
+    return C600DiagnosticSensorEntityDescription(
+        key=f"{phase}_time",
+        name=name,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-outline",
+        value_fn=lambda coordinator: coordinator.c600.timings.phases[phase].summary()["p50"],
+        attributes_fn=lambda coordinator: coordinator.c600.timings.phases[phase].summary(),
+    )
+
+
+DIAGNOSTIC_SENSORS: tuple[C600DiagnosticSensorEntityDescription, ...] = (
+    _phase_sensor("total", "Update time"),
+    _phase_sensor("lookup", "Device lookup time"),
+    _phase_sensor("connect", "Connect time"),
+    _phase_sensor("read", "Read time"),
+    _phase_sensor("decode", "Decode time"),
+    _phase_sensor("disconnect", "Disconnect time"),
+    C600DiagnosticSensorEntityDescription(
+        key="update_failures",
+        name="Update failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:alert-circle-outline",
+        value_fn=lambda coordinator: coordinator.c600.timings.failures,
+    ),
+    C600DiagnosticSensorEntityDescription(
+        key="update_retries",
+        name="Update retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        icon="mdi:refresh",
+        value_fn=lambda coordinator: coordinator.c600.timings.retries,
+    ),
+    C600DiagnosticSensorEntityDescription(
+        key="connection_circuit",
+        name="Connection circuit",
+        device_class=SensorDeviceClass.ENUM,
+        options=STATES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:electric-switch",
+        value_fn=lambda coordinator: coordinator.breaker.state,
+        attributes_fn=lambda coordinator: coordinator.breaker.stats(time.monotonic()),
+    ),
+)
+
+
+def _device_info(C600_device: C600Device) -> DeviceInfo:
+    """Return the device info shared by all entities of a device."""
+    return DeviceInfo(
+        connections={
+            (
+                CONNECTION_BLUETOOTH,
+                C600_device.address,
+            )
+        },
+        name=f"{C600_device.name} {C600_device.identifier}",
+        manufacturer="C600",
+        model="C600",
+        hw_version=C600_device.hw_version,
+        sw_version=C600_device.sw_version,
+    )
+
+
+class StateFilter:
+    """Decide whether a new sensor value is worth a state write.
+
+    Numeric values are written when they move at least ``deadband`` away
+    from the last written value, so a deadband equal to the resolution of a
+    sensor writes every step. Moving back against the direction of the
+    last written change additionally needs ``hysteresis``, which stops a
+    value jittering around a threshold from flapping. Anything is written
+    once ``max_silence`` seconds passed since the last write.
+    """
+
+    def __init__(
+        self,
+        deadband: float = 0,
+        hysteresis: float = 0,
+        max_silence: float = MAX_STATE_SILENCE,
+    ) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.hysteresis = hysteresis
+        self.max_silence = max_silence
+        self._last_value: StateType = None
+        self._last_write: float | None = None
+        self._direction = 0
+
+    def should_write(self, value: StateType, now: float) -> bool:
+        """Return True if the value should be written, and remember it if so."""
+        if self._last_write is None or now - self._last_write >= self.max_silence:
+            return self._accept(value, now)
+
+        last = self._last_value
+        if not isinstance(value, (int, float)) or not isinstance(last, (int, float)):
+            return value != last and self._accept(value, now)
+
+        delta = value - last
+        threshold = self.deadband
+        if self._direction and delta * self._direction < 0:
+            threshold += self.hysteresis
+        # The tolerance absorbs the float error of the subtraction, which
+        # would otherwise turn e.g. 7.22 - 7.20 into less than 0.02.
+        if not delta or abs(delta) < threshold - DEADBAND_TOLERANCE:
+            return False
+        return self._accept(value, now)
+
+    def _accept(self, value: StateType, now: float) -> bool:
+        last = self._last_value
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)) and value != last:
+            self._direction = 1 if value > last else -1
+        self._last_value = value
+        self._last_write = now
+        return True
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -104,7 +293,7 @@ async def async_setup_entry(
     """Set up the C600 BLE sensors."""
     is_metric = hass.config.units is METRIC_SYSTEM
 
-    coordinator: DataUpdateCoordinator[C600Device] = hass.data[DOMAIN][entry.entry_id]
+    coordinator: C600DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
     sensors_mapping = SENSORS_MAPPING_TEMPLATE.copy()
     entities = []
     _LOGGER.debug("got sensors: %s", coordinator.data.sensors)
@@ -119,6 +308,10 @@ async def async_setup_entry(
         entities.append(
             C600Sensor(coordinator, coordinator.data, sensors_mapping[sensor_type])
         )
+    entities.extend(
+        C600DiagnosticSensor(coordinator, coordinator.data, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
 
     async_add_entities(entities)
 
@@ -138,25 +331,22 @@ class C600Sensor(CoordinatorEntity[DataUpdateCoordinator[C600Device]], SensorEnt
         """Populate the C600 entity with relevant data."""
         super().__init__(coordinator)
         self.entity_description = entity_description
+        # Smoothed and windowed values share the deadband of their sensor.
+        key = entity_description.key
+        if key.endswith(("_ema", "_min", "_max", "_mean")):
+            key = key.rsplit("_", 1)[0]
+        self._filter = StateFilter(
+            SENSOR_DEADBANDS.get(key, 0),
+            SENSOR_HYSTERESIS.get(key, 0),
+        )
+        self._last_available: bool | None = None
 
         name = f"{C600_device.name} {C600_device.identifier}"
 
         self._attr_unique_id = f"{name}_{entity_description.key}"
 
         self._id = C600_device.address
-        self._attr_device_info = DeviceInfo(
-            connections={
-                (
-                    CONNECTION_BLUETOOTH,
-                    C600_device.address,
-                )
-            },
-            name=name,
-            manufacturer="C600",
-            model="C600",
-            hw_version=C600_device.hw_version,
-            sw_version=C600_device.sw_version,
-        )
+        self._attr_device_info = _device_info(C600_device)
 
     @property
     def native_value(self) -> StateType:
@@ -165,3 +355,58 @@ class C600Sensor(CoordinatorEntity[DataUpdateCoordinator[C600Device]], SensorEnt
             return self.coordinator.data.sensors[self.entity_description.key]
         except KeyError:
             return None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._filter.should_write(self.native_value, time.monotonic())
+        self._last_available = self.available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the value changed enough."""
+        available = self.available
+        changed = self._filter.should_write(self.native_value, time.monotonic())
+        if changed or available != self._last_available:
+            self._last_available = available
+            self.async_write_ha_state()
+
+
+class C600DiagnosticSensor(CoordinatorEntity[C600DataUpdateCoordinator], SensorEntity):
+    """Reports how updates of the device perform."""
+
+    _attr_has_entity_name = True
+    # The latency statistics change on every update, keep them out of the
+    # recorder.
+    _unrecorded_attributes = frozenset({"p50", "p95", "max", "count", "failures"})
+    entity_description: C600DiagnosticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: C600DataUpdateCoordinator,
+        C600_device: C600Device,
+        entity_description: C600DiagnosticSensorEntityDescription,
+    ) -> None:
+        """Populate the diagnostic entity."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        name = f"{C600_device.name} {C600_device.identifier}"
+        self._attr_unique_id = f"{name}_{entity_description.key}"
+        self._attr_device_info = _device_info(C600_device)
+
+    @property
+    def available(self) -> bool:
+        """Stay available while updates fail, that is when these matter most."""
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value reported by the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the full statistics."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator)
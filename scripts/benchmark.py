@@ -0,0 +1,172 @@
+"""Offline benchmarks for the C600 parser
+
+Run with ``python -m scripts.benchmark`` from the root of this repository.
+Measures decoder throughput, update_device latency and allocations per
+poll against a fake peer, so no hardware is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+import timeit
+import tracemalloc
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from custom_components.ble_c600.BLE_C600.decoder import (
+    decode_array,
+    decode_frame,
+    decode_frames,
+)
+from custom_components.ble_c600.BLE_C600.frame import FRAME_LENGTH
+from custom_components.ble_c600.BLE_C600.parser import C600BluetoothDeviceData
+
+from .fake import FakeC600Peer, patch_connection
+
+
+def decode_reference(byte_frame: bytes) -> list[int]:
+    """The original per byte decoder, kept as the correctness baseline."""
+    frame_array = [int(x) for x in byte_frame]
+    size = len(frame_array)
+
+    for i in range(size - 1, 0, -1):
+        tmp = frame_array[i]
+        hibit1 = (tmp & 0x55) << 1
+        lobit1 = (tmp & 0xAA) >> 1
+        tmp = frame_array[i - 1]
+        hibit = (tmp & 0x55) << 1
+        lobit = (tmp & 0xAA) >> 1
+        frame_array[i] = 0xFF - (hibit1 | lobit)
+        frame_array[i - 1] = 0xFF - (hibit | lobit1)
+
+    return frame_array
+
+
+def random_frames(count: int, length: int = FRAME_LENGTH, seed: int = 0) -> list[bytes]:
+    """Generate reproducible random raw frames."""
+    rng = random.Random(seed)
+    return [bytes(rng.getrandbits(8) for _ in range(length)) for _ in range(count)]
+
+
+def _rate(func, count: int, repeat: int) -> float:
+    """Return the best frames per second over ``repeat`` runs."""
+    return count / min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(count: int = 10000, repeat: int = 5) -> dict[str, float]:
+    """Check the decoders agree and measure their throughput."""
+    frames = random_frames(count)
+    expected = [decode_reference(frame) for frame in frames]
+    if [list(decode_frame(frame)) for frame in frames] != expected:
+        raise AssertionError("decode_frame does not match the reference decoder")
+    if [list(frame) for frame in decode_frames(frames)] != expected:
+        raise AssertionError("decode_frames does not match the reference decoder")
+
+    results = {
+        "reference": _rate(lambda: [decode_reference(f) for f in frames], count, repeat),
+        "decode_frame": _rate(lambda: [decode_frame(f) for f in frames], count, repeat),
+        "decode_frames": _rate(lambda: decode_frames(frames), count, repeat),
+    }
+
+    if np is not None:
+        array = np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(count, -1)
+        if decode_array(array).tolist() != expected:
+            raise AssertionError("decode_array does not match the reference decoder")
+        results["decode_array"] = _rate(lambda: decode_array(array), count, repeat)
+
+    return results
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Return p50/p95/p99/max of the samples."""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+async def _update_latency(peer: FakeC600Peer, polls: int) -> list[float]:
+    c600 = C600BluetoothDeviceData(logging.getLogger(__name__))
+    samples = []
+    with patch_connection(peer):
+        for _ in range(polls):
+            start = time.perf_counter()
+            await c600.update_device(peer.ble_device)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_update(
+    polls: int = 1000,
+    connect_latency: float = 0.0,
+    read_latency: float = 0.0,
+) -> dict[str, float]:
+    """Measure end to end update_device latency in seconds."""
+    peer = FakeC600Peer(connect_latency=connect_latency, read_latency=read_latency)
+    return percentiles(asyncio.run(_update_latency(peer, polls)))
+
+
+async def _allocations(polls: int) -> dict[str, float]:
+    peer = FakeC600Peer()
+    c600 = C600BluetoothDeviceData(logging.getLogger(__name__))
+    with patch_connection(peer):
+        # Warm up so caches and the preallocated device are in place.
+        await c600.update_device(peer.ble_device)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _peak = tracemalloc.get_traced_memory()
+            for _ in range(polls):
+                await c600.update_device(peer.ble_device)
+            _current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return {
+        "retained_blocks": sum(max(stat.count_diff, 0) for stat in diff) / polls,
+        "peak_bytes": peak - base,
+    }
+
+
+def run_allocations(polls: int = 200) -> dict[str, float]:
+    """Return blocks retained per poll and the peak memory used while polling."""
+    return asyncio.run(_allocations(polls))
+
+
+def main() -> None:
+    """Print the benchmark results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--polls", type=int, default=1000)
+    parser.add_argument("--connect-latency", type=float, default=0.0)
+    parser.add_argument("--read-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    results = run(args.frames, args.repeat)
+    baseline = results["reference"]
+    for name, rate in results.items():
+        print(f"{name:>14}: {rate:12,.0f} frames/s  x{rate / baseline:6.1f}")
+
+    latency = run_update(args.polls, args.connect_latency, args.read_latency)
+    print(
+        "update_device: "
+        + "  ".join(f"{name} {value * 1000:.3f} ms" for name, value in latency.items())
+    )
+    allocations = run_allocations()
+    print(
+        f"  allocations: {allocations['retained_blocks']:.1f} blocks retained per poll, "
+        f"peak {allocations['peak_bytes'] / 1024:.1f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
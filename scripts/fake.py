@@ -0,0 +1,199 @@
+"""Stand in for BleakClient serving recorded or synthetic C600 frames
+
+Used by the benchmarks and simulations to exercise the parser without a
+radio. ``patch_connection`` swaps ``establish_connection`` of the parser
+for one that connects to a ``FakeC600Peer``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+import dataclasses
+import itertools
+import random
+from typing import Any, Callable, Iterable, Iterator
+from unittest import mock
+
+from bleak import BleakError
+
+from custom_components.ble_c600.BLE_C600 import parser
+from custom_components.ble_c600.BLE_C600.frame import build_frame
+from custom_components.ble_c600.BLE_C600.parser import READ_UUID
+
+
+@dataclasses.dataclass
+class FakeBLEDevice:
+    """The parts of a BLEDevice the parser uses."""
+
+    address: str
+    name: str | None = None
+    details: Any = None
+
+
+@dataclasses.dataclass
+class FakeCharacteristic:
+    """A GATT characteristic of the fake peer."""
+
+    uuid: str
+    properties: list[str]
+    handle: int = 0x10
+
+
+class FakeServices:
+    """A service collection holding only the C600 characteristic."""
+
+    def __init__(self, characteristic: FakeCharacteristic) -> None:
+        self.characteristic = characteristic
+
+    def get_characteristic(self, specifier: Any) -> FakeCharacteristic | None:
+        if specifier in (self.characteristic.uuid, self.characteristic.handle):
+            return self.characteristic
+        return None
+
+
+def synthetic_frames(seed: int = 0) -> Iterator[bytes]:
+    """Yield an endless random walk of plausible raw frames."""
+    rng = random.Random(seed)
+    values = {
+        "constant": 0x20,
+        "product_code": 0x06,
+        "pH": 7.2,
+        "EC": 1200,
+        "TDS": 600,
+        "cloro": 1.5,
+        "temperature": 26.0,
+        "battery": 90,
+        "status": 0,
+        "ORP": 0.7,
+    }
+    while True:
+        values["pH"] = round(min(max(values["pH"] + rng.gauss(0, 0.02), 0), 14), 2)
+        values["EC"] = max(values["EC"] + round(rng.gauss(0, 5)), 0)
+        values["TDS"] = values["EC"] // 2
+        values["cloro"] = round(max(values["cloro"] + rng.gauss(0, 0.05), 0), 1)
+        values["temperature"] = round(values["temperature"] + rng.gauss(0, 0.05), 1)
+        values["ORP"] = round(values["ORP"] + rng.gauss(0, 0.002), 3)
+        yield build_frame(values)
+
+
+@dataclasses.dataclass
+class FakeC600Peer:
+    """A virtual C600 with configurable latency and failures.
+
+    Frames are served in order from ``frames`` (recorded captures or
+    ``synthetic_frames``) and repeated once exhausted. Latencies are in
+    seconds, failure rates are probabilities per operation.
+    """
+
+    address: str = "AA:BB:CC:DD:EE:FF"
+    frames: Iterable[bytes] | None = None
+    connect_latency: float = 0.0
+    read_latency: float = 0.0
+    connect_failure_rate: float = 0.0
+    read_failure_rate: float = 0.0
+    notify: bool = False
+    seed: int = 0
+    connects: int = 0
+    reads: int = 0
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        frames = synthetic_frames(self.seed) if self.frames is None else self.frames
+        self._frames = itertools.cycle(frames)
+        properties = ["read", "notify"] if self.notify else ["read"]
+        self.services = FakeServices(FakeCharacteristic(READ_UUID, properties))
+
+    @property
+    def ble_device(self) -> FakeBLEDevice:
+        """Return a BLEDevice stand in for the peer."""
+        return FakeBLEDevice(self.address, f"BLE-C600 {self.address[-5:]}")
+
+    def next_frame(self) -> bytes:
+        """Return the next raw frame."""
+        return next(self._frames)
+
+    def failed(self, rate: float) -> bool:
+        """Roll for a failure."""
+        return rate > 0 and self._rng.random() < rate
+
+
+class FakeBleakClient:
+    """Implements the BleakClient calls made by the parser."""
+
+    def __init__(
+        self,
+        peer: FakeC600Peer,
+        disconnected_callback: Callable[[FakeBleakClient], None] | None = None,
+    ) -> None:
+        self.peer = peer
+        self.services = peer.services
+        self.is_connected = True
+        self._disconnected_callback = disconnected_callback
+        self._notify_task: asyncio.Task | None = None
+
+    async def read_gatt_char(self, char_specifier: Any, **kwargs: Any) -> bytearray:
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        if self.peer.read_latency:
+            await asyncio.sleep(self.peer.read_latency)
+        if self.peer.failed(self.peer.read_failure_rate):
+            raise BleakError("Simulated read failure")
+        self.peer.reads += 1
+        return bytearray(self.peer.next_frame())
+
+    async def start_notify(
+        self, char_specifier: Any, callback: Callable[[Any, bytearray], None], **kwargs: Any
+    ) -> None:
+        async def _notify() -> None:
+            while self.is_connected:
+                await asyncio.sleep(max(self.peer.read_latency, 0.001))
+                callback(char_specifier, bytearray(self.peer.next_frame()))
+
+        self._notify_task = asyncio.create_task(_notify())
+
+    async def clear_cache(self) -> bool:
+        return True
+
+    async def disconnect(self) -> bool:
+        if self._notify_task is not None:
+            self._notify_task.cancel()
+            self._notify_task = None
+        if self.is_connected:
+            self.is_connected = False
+            if self._disconnected_callback is not None:
+                self._disconnected_callback(self)
+        return True
+
+
+def fake_establish_connection(peers: dict[str, FakeC600Peer]):
+    """Return an establish_connection replacement connecting to ``peers``."""
+
+    async def _establish_connection(
+        client_class: Any,
+        device: Any,
+        name: str,
+        disconnected_callback: Callable[[Any], None] | None = None,
+        **kwargs: Any,
+    ) -> FakeBleakClient:
+        peer = peers.get(device.address)
+        if peer is None:
+            raise BleakError(f"{name}: device not found")
+        if peer.connect_latency:
+            await asyncio.sleep(peer.connect_latency)
+        if peer.failed(peer.connect_failure_rate):
+            raise BleakError(f"{name}: simulated connection failure")
+        peer.connects += 1
+        return FakeBleakClient(peer, disconnected_callback)
+
+    return _establish_connection
+
+
+@contextmanager
+def patch_connection(*peers: FakeC600Peer) -> Iterator[dict[str, FakeC600Peer]]:
+    """Route connections made by the parser to the given fake peers."""
+    by_address = {peer.address: peer for peer in peers}
+    with mock.patch.object(
+        parser, "establish_connection", fake_establish_connection(by_address)
+    ):
+        yield by_address
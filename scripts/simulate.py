@@ -0,0 +1,397 @@
+"""Load simulator for C600 BLE
+
+Run with ``python -m scripts.simulate`` from the root of this repository.
+It is kept out of ``custom_components`` so it is not installed with the
+integration.
+Starts a local Home Assistant instance, replaces the bluetooth integration
+and the BLE connections with virtual C600 devices and sets up one config
+entry per device through the regular setup path. Reports event loop lag,
+reading throughput and CPU time per device.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+import dataclasses
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.components import bluetooth
+from homeassistant.const import CONF_SCAN_INTERVAL, EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from custom_components.ble_c600.const import CONF_PERSISTENT_CONNECTION, DOMAIN
+from custom_components.ble_c600.publisher import async_get_publisher
+
+from .fake import FakeC600Peer, patch_connection
+
+# How often the event loop lag is sampled, in seconds
+LAG_PROBE_INTERVAL = 0.05
+
+
+@dataclasses.dataclass
+class VirtualC600:
+    """A simulated device: its BLE peer, advertising cadence and signal."""
+
+    peer: FakeC600Peer
+    advertising_interval: float = 1.0
+    # RSSI per adapter or proxy that hears the device
+    sources: dict[str, int] = dataclasses.field(default_factory=lambda: {"hci0": -60})
+
+    @property
+    def address(self) -> str:
+        return self.peer.address
+
+
+class FakeBluetooth:
+    """Stands in for the bluetooth integration for a set of virtual devices."""
+
+    def __init__(self, hass: HomeAssistant, devices: list[VirtualC600]) -> None:
+        self.hass = hass
+        self.devices = {device.address: device for device in devices}
+        self.advertisements = 0
+        self._callbacks: dict[str, list[Callable[..., None]]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def _service_info(self, device: VirtualC600) -> SimpleNamespace:
+        source, rssi = max(device.sources.items(), key=lambda item: item[1])
+        return SimpleNamespace(
+            name=device.peer.ble_device.name,
+            address=device.address,
+            rssi=rssi + random.randint(-3, 3),
+            manufacturer_data={},
+            service_data={},
+            service_uuids=[],
+            source=source,
+            device=device.peer.ble_device,
+            connectable=True,
+        )
+
+    @callback
+    def async_register_callback(
+        self,
+        hass: HomeAssistant,
+        callback_: Callable[..., None],
+        match_dict: dict[str, Any] | None,
+        mode: Any,
+    ) -> CALLBACK_TYPE:
+        address = (match_dict or {}).get("address")
+        callbacks = self._callbacks.setdefault(address, [])
+        callbacks.append(callback_)
+        return lambda: callbacks.remove(callback_)
+
+    @callback
+    def async_track_unavailable(
+        self, hass: HomeAssistant, *args: Any, **kwargs: Any
+    ) -> CALLBACK_TYPE:
+        return lambda: None
+
+    @callback
+    def async_address_present(
+        self, hass: HomeAssistant, address: str, connectable: bool = True
+    ) -> bool:
+        return address in self.devices
+
+    @callback
+    def async_ble_device_from_address(
+        self, hass: HomeAssistant, address: str, connectable: bool = True
+    ) -> Any:
+        device = self.devices.get(address)
+        return None if device is None else device.peer.ble_device
+
+    @callback
+    def async_last_service_info(
+        self, hass: HomeAssistant, address: str, connectable: bool = True
+    ) -> Any:
+        device = self.devices.get(address)
+        return None if device is None else self._service_info(device)
+
+    @callback
+    def async_scanner_devices_by_address(
+        self, hass: HomeAssistant, address: str, connectable: bool = True
+    ) -> list[SimpleNamespace]:
+        if (device := self.devices.get(address)) is None:
+            return []
+        return [
+            SimpleNamespace(
+                scanner=SimpleNamespace(source=source),
+                ble_device=device.peer.ble_device,
+                advertisement=SimpleNamespace(rssi=rssi + random.randint(-3, 3)),
+            )
+            for source, rssi in device.sources.items()
+        ]
+
+    async def _advertise(self, device: VirtualC600) -> None:
+        await asyncio.sleep(random.uniform(0, device.advertising_interval))
+        while True:
+            service_info = self._service_info(device)
+            for callback_ in list(self._callbacks.get(device.address, ())):
+                callback_(service_info, bluetooth.BluetoothChange.ADVERTISEMENT)
+            self.advertisements += 1
+            await asyncio.sleep(device.advertising_interval * random.uniform(0.8, 1.2))
+
+    def start(self) -> None:
+        """Start advertising every device."""
+        self._tasks = [
+            self.hass.async_create_background_task(
+                self._advertise(device), f"{DOMAIN} simulated advertisements"
+            )
+            for device in self.devices.values()
+        ]
+
+    async def stop(self) -> None:
+        """Stop advertising."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @contextmanager
+    def patch(self) -> Iterator[None]:
+        """Route the bluetooth calls of the integration to the virtual devices."""
+        with mock.patch.multiple(
+            bluetooth,
+            async_register_callback=self.async_register_callback,
+            async_track_unavailable=self.async_track_unavailable,
+            async_address_present=self.async_address_present,
+            async_ble_device_from_address=self.async_ble_device_from_address,
+            async_last_service_info=self.async_last_service_info,
+            async_scanner_devices_by_address=self.async_scanner_devices_by_address,
+        ):
+            yield
+
+
+class LagMonitor:
+    """Measure how late the event loop runs a task that sleeps regularly."""
+
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(loop.time() - start - self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> dict[str, float]:
+        """Return lag percentiles in milliseconds."""
+        if not self.samples:
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "p50": statistics.median(ordered) * 1000,
+            "p95": ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)] * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+
+def virtual_devices(
+    count: int,
+    proxies: int = 1,
+    advertising_interval: float = 1.0,
+    connect_latency: float = 0.5,
+    read_latency: float = 0.1,
+    failure_rate: float = 0.0,
+    offline: float = 0.0,
+    notify: bool = False,
+    seed: int = 0,
+) -> list[VirtualC600]:
+    """Return ``count`` devices with randomized latency and signal.
+
+    A fraction ``offline`` of them never accepts a connection.
+    """
+    rng = random.Random(seed)
+    sources = [f"proxy{index}" for index in range(proxies)]
+    devices = []
+    for index in range(count):
+        never_connects = index < round(count * offline)
+        peer = FakeC600Peer(
+            address=f"C6:00:00:00:{index >> 8:02X}:{index & 0xFF:02X}",
+            connect_latency=connect_latency * rng.uniform(0.5, 1.5),
+            read_latency=read_latency * rng.uniform(0.5, 1.5),
+            connect_failure_rate=1.0 if never_connects else failure_rate,
+            read_failure_rate=failure_rate,
+            notify=notify,
+            seed=seed + index,
+        )
+        heard_by = rng.sample(sources, min(len(sources), rng.randint(1, 2)))
+        devices.append(
+            VirtualC600(
+                peer,
+                advertising_interval * rng.uniform(0.5, 1.5),
+                {source: rng.randint(-95, -55) for source in heard_by},
+            )
+        )
+    return devices
+
+
+async def _async_setup_hass(config_dir: str) -> HomeAssistant:
+    """Start a bare Home Assistant able to load config entries."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    # The bluetooth stack is simulated.
+    hass.config.components.update({"bluetooth", "bluetooth_adapters"})
+    await hass.async_start()
+    return hass
+
+
+async def async_simulate(
+    devices: list[VirtualC600],
+    duration: float,
+    scan_interval: float,
+    persistent: bool = False,
+) -> dict[str, Any]:
+    """Run the integration against ``devices`` for ``duration`` seconds."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_setup_hass(config_dir)
+        fake = FakeBluetooth(hass, devices)
+        state_writes = 0
+
+        @callback
+        def _count_state(event: Event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        with ExitStack() as stack:
+            stack.enter_context(fake.patch())
+            stack.enter_context(patch_connection(*(device.peer for device in devices)))
+            hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state)
+            monitor = LagMonitor()
+            monitor.start()
+            fake.start()
+
+            cpu_start = time.process_time()
+            start = time.monotonic()
+            entries = [
+                config_entries.ConfigEntry(
+                    version=1,
+                    minor_version=1,
+                    domain=DOMAIN,
+                    title=device.peer.ble_device.name,
+                    data={},
+                    source=config_entries.SOURCE_BLUETOOTH,
+                    options={
+                        CONF_SCAN_INTERVAL: scan_interval,
+                        CONF_PERSISTENT_CONNECTION: persistent,
+                    },
+                    unique_id=device.address,
+                )
+                for device in devices
+            ]
+            # Entries are set up concurrently, as on startup.
+            await asyncio.gather(
+                *(hass.config_entries.async_add(entry) for entry in entries)
+            )
+            setup_time = time.monotonic() - start
+
+            await asyncio.sleep(duration)
+            elapsed = time.monotonic() - start
+            cpu = time.process_time() - cpu_start
+
+            coordinators = list(hass.data.get(DOMAIN, {}).values())
+            updates = sum(
+                timings.phases["total"].count
+                for timings in (coordinator.c600.timings for coordinator in coordinators)
+            )
+            reads = sum(device.peer.reads for device in devices)
+            failures = sum(coordinator.c600.timings.failures for coordinator in coordinators)
+            publisher = async_get_publisher(hass).stats()
+
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await fake.stop()
+            await monitor.stop()
+            await hass.async_stop(force=True)
+
+    return {
+        "devices": len(devices),
+        "loaded": len(coordinators),
+        "setup_seconds": setup_time,
+        "seconds": elapsed,
+        "advertisements_per_second": fake.advertisements / elapsed,
+        "updates_per_second": updates / elapsed,
+        "reads_per_second": reads / elapsed,
+        "state_writes_per_second": state_writes / elapsed,
+        "update_failures": failures,
+        "cpu_ms_per_device_second": cpu * 1000 / elapsed / len(devices),
+        "cpu_percent": cpu * 100 / elapsed,
+        "batches_per_second": publisher["batches"] / elapsed,
+        "devices_per_batch": publisher["devices_per_batch"],
+        "batch_ms": publisher["duration"],
+        "loop_lag_ms": monitor.summary(),
+    }
+
+
+def main() -> None:
+    """Print the results of a simulation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--proxies", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--scan-interval", type=float, default=10.0)
+    parser.add_argument("--advertising-interval", type=float, default=1.0)
+    parser.add_argument("--connect-latency", type=float, default=0.5)
+    parser.add_argument("--read-latency", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--offline", type=float, default=0.0, help="fraction of unreachable devices"
+    )
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument("--notify", action="store_true", help="devices support notify")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    devices = virtual_devices(
+        args.devices,
+        args.proxies,
+        args.advertising_interval,
+        args.connect_latency,
+        args.read_latency,
+        args.failure_rate,
+        args.offline,
+        args.notify,
+        args.seed,
+    )
+    results = asyncio.run(
+        async_simulate(devices, args.duration, args.scan_interval, args.persistent)
+    )
+    lag = results.pop("loop_lag_ms")
+    batch = results.pop("batch_ms")
+    for name, value in results.items():
+        if isinstance(value, float):
+            print(f"{name:>26}: {value:,.3f}")
+        else:
+            print(f"{name:>26}: {value}")
+    print(
+        f"{'batch_ms':>26}: "
+        + "  ".join(f"{name} {batch[name]}" for name in ("p50", "p95", "max"))
+    )
+    print(
+        f"{'loop_lag_ms':>26}: "
+        + "  ".join(f"{name} {value:.3f}" for name, value in lag.items())
+    )
+
+
+if __name__ == "__main__":
+    main()